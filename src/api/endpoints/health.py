@@ -9,12 +9,14 @@ from datetime import datetime
 from typing import Dict, Any, Literal, cast
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, Response
+import orjson
 import structlog
 
 from src.config.settings import Settings, get_settings_dependency
 from src.models.chat_models import HealthCheckResponse
 from src.services.ai_service import AzureOpenAIService
-from src.services.monitoring_service import get_monitoring_service
+from src.services.monitoring_service import get_monitoring_service, orjson_default
 
 
 logger = structlog.get_logger()
@@ -169,10 +171,10 @@ async def liveness_probe() -> Dict[str, Any]:
     return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
 
 
-@router.get("/health/metrics")
+@router.get("/health/metrics", response_class=ORJSONResponse)
 async def metrics_endpoint(
     settings: Settings = Depends(get_settings_dependency),
-) -> Dict[str, Any]:
+) -> Response:
     """
     Metrics endpoint for monitoring systems.
 
@@ -190,25 +192,14 @@ async def metrics_endpoint(
     monitoring = get_monitoring_service(settings)
 
     try:
-        # Get comprehensive metrics
-        health_metrics = await monitoring.get_health_metrics()
-        metrics_export = await monitoring.get_metrics_export()
-
-        return {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "service": "ai-career-mentor",
-            "version": settings.app_version,
-            "environment": "production",  # TODO: Add environment field to settings
-            "health": health_metrics,
-            "detailed_metrics": metrics_export.get("metrics", {}),
-            "collection_status": {
-                "enabled": True,
-                "application_insights": bool(
-                    settings.azure_application_insights_connection_string
-                ),
-                "in_memory_fallback": True,
-            },
-        }
+        # Encoded here rather than via a response model: the report holds
+        # read-only views of the live metric tables
+        return Response(
+            content=orjson.dumps(
+                await monitoring.get_metrics_report(), default=orjson_default
+            ),
+            media_type="application/json",
+        )
 
     except Exception as e:
         logger.error("Failed to get metrics", error=str(e))
@@ -40,15 +40,22 @@ class Settings(BaseSettings):
     azure_search_endpoint: str = "https://your-search.search.windows.net"
     azure_search_key: str = "your-azure-search-key"
     azure_search_index_name: str = "career-knowledge"
+    search_upload_rate: float = 10.0  # Document upload requests per second
 
     # RAG Configuration
     rag_max_search_results: int = 5
     rag_min_confidence_score: float = 0.7
     rag_enable_by_default: bool = True
 
+    # Vector index (HNSW) parameters, within Azure Cognitive Search's limits
+    hnsw_m: int = 10  # Graph links per node (4-10)
+    hnsw_ef_construction: int = 200  # Candidate list size when building (100-1000)
+    hnsw_ef_search: int = 100  # Candidate list size when querying (100-1000)
+
     # Embedding Configuration
     azure_openai_embedding_deployment: str = "text-embedding-ada-002"
     embedding_dimensions: int = 1536
+    embedding_max_concurrency: int = 5  # Concurrent embedding requests per service
 
     # Azure Cosmos DB Configuration
     azure_cosmos_endpoint: str = "https://your-cosmos.documents.azure.com:443/"
@@ -64,6 +71,8 @@ class Settings(BaseSettings):
 
     # Chat Configuration
     max_conversation_history: int = 20
+    max_conversations: int = 10000
+    conversation_ttl_seconds: int = 3600  # Idle conversations are dropped after 1 hour
     default_temperature: float = 0.7
     max_tokens: int = 1000
 
@@ -109,6 +118,24 @@ class Settings(BaseSettings):
             raise ValueError("RAG max search results must be between 1 and 20")
         return v
 
+    @field_validator("hnsw_m")
+    @classmethod
+    def validate_hnsw_m(cls, v: int) -> int:
+        """Validate HNSW m is within the range Azure Cognitive Search accepts."""
+        if not 4 <= v <= 10:
+            raise ValueError("HNSW m must be between 4 and 10")
+        return v
+
+    @field_validator("hnsw_ef_construction", "hnsw_ef_search")
+    @classmethod
+    def validate_hnsw_ef(cls, v: int) -> int:
+        """Validate HNSW candidate list sizes are within Azure's range."""
+        if not 100 <= v <= 1000:
+            raise ValueError(
+                "HNSW efConstruction and efSearch must be between 100 and 1000"
+            )
+        return v
+
 
 @lru_cache()
 def get_settings() -> Settings:
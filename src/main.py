@@ -139,6 +139,14 @@ def create_app() -> FastAPI:
     #     logger.warning("Monitoring middleware not available - continuing without it")
     logger.warning("Monitoring middleware temporarily disabled")
 
+    # Expose Prometheus metrics (request counts and latency histograms) at /metrics
+    try:
+        from prometheus_fastapi_instrumentator import Instrumentator
+
+        Instrumentator().instrument(app).expose(app, include_in_schema=False)
+    except ImportError:
+        logger.warning("Prometheus instrumentation not available - continuing without it")
+
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -14,9 +14,15 @@ from pydantic import BaseModel, Field, field_validator
 
 
 class ChatMessage(BaseModel):
-    """A single chat message in a conversation."""
+    """A single chat message in a conversation.
+
+    Messages are immutable once created, so conversation histories can hold
+    and share them without defensive copies.
+    """
     
     model_config = {
+        "frozen": True,
+        "extra": "forbid",
         "json_encoders": {
             datetime: lambda v: v.isoformat()
         }
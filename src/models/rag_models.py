@@ -119,6 +119,10 @@ class SearchQuery(BaseModel):
         le=1.0, 
         description="Minimum similarity score for results"
     )
+    exhaustive: bool = Field(
+        default=False,
+        description="Compare against every stored vector instead of the HNSW graph"
+    )
     
     class Config:
         json_schema_extra = {
@@ -3,9 +3,24 @@ Simple in-memory cache for chatbot responses.
 This provides immediate performance improvements without external dependencies.
 """
 
+import asyncio
 import hashlib
+import math
 import time
-from typing import Dict, Optional, Tuple
+from array import array
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 from threading import Lock
 
 
@@ -66,6 +81,202 @@ class SimpleResponseCache:
         """Get current cache size."""
         return len(self._cache)
 
+K = TypeVar("K")
+V = TypeVar("V")
+
+# Semantic cache key: (scope, unit-length float32 embedding bytes)
+_ScopedEmbedding = Tuple[Hashable, bytes]
+# Semantic cache entry: (response, timestamp, unit-length embedding)
+_SemanticEntry = Tuple[Any, float, Tuple[float, ...]]
+
+
+def _normalize(vector: Sequence[float]) -> Tuple[float, ...]:
+    """Scale a vector to unit length so cosine similarity is a dot product."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return tuple(vector)
+    return tuple(x / norm for x in vector)
+
+
+class SemanticResponseCache:
+    """
+    In-memory cache of responses keyed by query embedding.
+
+    Lookups return the stored response whose query embedding is most similar
+    to the new one, provided the cosine similarity clears the threshold, so
+    paraphrased questions can reuse an earlier answer. An optional hashable
+    scope (such as the query's filters) restricts matches to entries stored
+    under the same scope.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: int = 1800,
+        similarity_threshold: float = 0.92,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # (scope, float32 embedding bytes) -> (response, timestamp, embedding),
+        # least recently used first. Embeddings are kept as tuples of floats:
+        # math.dist reads those directly, while a packed array would be
+        # converted element by element on every comparison.
+        self._cache: "OrderedDict[_ScopedEmbedding, _SemanticEntry]" = OrderedDict()
+        self._lock = Lock()
+
+    def _query_key(
+        self, embedding: List[float], scope: Hashable
+    ) -> Tuple[Tuple[float, ...], _ScopedEmbedding]:
+        """Normalize a query embedding and build its exact-match key."""
+        query = _normalize(embedding)
+        return query, (scope, array("f", query).tobytes())
+
+    def _lookup_exact(self, key: _ScopedEmbedding, now: float) -> Optional[Any]:
+        """Return the live entry stored under exactly this key, if any."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or now - entry[1] > self.ttl_seconds:
+                return None
+            self._cache.move_to_end(key)
+            return entry[0]
+
+    def _lookup_similar(
+        self, query: Sequence[float], scope: Hashable, now: float
+    ) -> Optional[Any]:
+        """Scan every entry for the most similar one above the threshold."""
+        # The scan runs on a snapshot, so the lock is not held while it runs
+        with self._lock:
+            entries = list(self._cache.items())
+
+        # For unit vectors |a - b|^2 = 2 - 2cos(a, b), so the most similar
+        # entry is the nearest one, and the C-level math.dist does the work
+        best_key = None
+        best_distance = math.sqrt(max(0.0, 2.0 - 2.0 * self.similarity_threshold))
+        expired = []
+        for key, (_, timestamp, vector) in entries:
+            if now - timestamp > self.ttl_seconds:
+                expired.append(key)
+                continue
+            if key[0] != scope:
+                continue
+            distance = math.dist(vector, query)
+            if distance <= best_distance:
+                best_key, best_distance = key, distance
+
+        with self._lock:
+            for key in expired:
+                # Skip entries that were re-cached while the scan ran
+                entry = self._cache.get(key)
+                if entry is not None and now - entry[1] > self.ttl_seconds:
+                    del self._cache[key]
+
+            entry = self._cache.get(best_key) if best_key is not None else None
+            if entry is None:
+                return None
+            self._cache.move_to_end(best_key)
+            return entry[0]
+
+    def get(self, embedding: List[float], scope: Hashable = None) -> Optional[Any]:
+        """Get the most similar cached response above the threshold, if any."""
+        query, key = self._query_key(embedding, scope)
+        now = time.time()
+
+        cached = self._lookup_exact(key, now)
+        if cached is not None:
+            return cached
+        return self._lookup_similar(query, scope, now)
+
+    async def aget(
+        self, embedding: List[float], scope: Hashable = None
+    ) -> Optional[Any]:
+        """
+        Async variant of get for use on the event loop.
+
+        Exact matches are answered inline; the similarity scan is O(entries x
+        dimensions) in pure Python (several milliseconds for a few hundred
+        1536-dimension entries), so it runs in a worker thread.
+        """
+        query, key = self._query_key(embedding, scope)
+        now = time.time()
+
+        cached = self._lookup_exact(key, now)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self._lookup_similar, query, scope, now)
+
+    def set(self, embedding: List[float], response: Any, scope: Hashable = None):
+        """Cache a response under its query embedding."""
+        query, key = self._query_key(embedding, scope)
+
+        with self._lock:
+            self._cache[key] = (response, time.time(), query)
+            self._cache.move_to_end(key)
+            # Evict least recently used entries
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        """Clear all cached responses."""
+        with self._lock:
+            self._cache.clear()
+
+    def size(self) -> int:
+        """Get current cache size."""
+        return len(self._cache)
+
+
+class ExpiringLRUDict(MutableMapping[K, V]):
+    """
+    Size-bounded mapping whose entries expire after a period without access.
+
+    Reads and writes both refresh an entry, so values that are mutated in
+    place (such as conversation histories) stay alive while in use. Once full,
+    the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # key -> (value, last access), least recently used first
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+
+    def _expire(self, now: float):
+        """Drop entries idle for longer than the TTL (oldest first)."""
+        data = self._data
+        while data:
+            key, (_, last_access) = next(iter(data.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            del data[key]
+
+    def __getitem__(self, key: K) -> V:
+        now = time.monotonic()
+        self._expire(now)
+        value, _ = self._data[key]
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: K, value: V):
+        now = time.monotonic()
+        self._expire(now)
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key: K):
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[K]:
+        self._expire(time.monotonic())
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._data)
+
 
 # Global cache instance
 response_cache = SimpleResponseCache(max_size=500, ttl_seconds=1800)  # 30 minutes TTL
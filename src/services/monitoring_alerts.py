@@ -10,10 +10,13 @@ This module provides:
 """
 
 import asyncio
+import operator
+import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Callable
-from dataclasses import dataclass
-from enum import Enum
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from dataclasses import dataclass, field
+from enum import StrEnum
+import orjson
 import structlog
 
 from src.config.settings import Settings
@@ -23,7 +26,24 @@ from src.services.monitoring_service import MonitoringService
 logger = structlog.get_logger()
 
 
-class AlertSeverity(Enum):
+def _never_breached(value: float, threshold: float) -> bool:
+    """Comparator used for rules with an unknown comparison operator."""
+    return False
+
+
+# Minimum seconds between "monitoring duration" logs for the same rule
+_OBSERVE_LOG_INTERVAL_SECONDS = 60.0
+
+_COMPARATORS: Dict[str, Callable[[float, float], bool]] = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "eq": operator.eq,
+}
+
+
+class AlertSeverity(StrEnum):
     """Alert severity levels."""
 
     INFO = "info"
@@ -31,7 +51,7 @@ class AlertSeverity(Enum):
     CRITICAL = "critical"
 
 
-class AlertStatus(Enum):
+class AlertStatus(StrEnum):
     """Alert status."""
 
     ACTIVE = "active"
@@ -68,6 +88,24 @@ class Alert:
     message: str = ""
     additional_data: Optional[Dict[str, Any]] = None
     _notified: bool = False
+    _json_payload: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize the alert notification payload, memoized per fire."""
+        if self._json_payload is None:
+            self._json_payload = orjson.dumps(
+                {
+                    "alert_id": self.id,
+                    "rule_name": self.rule.name,
+                    "severity": self.rule.severity,
+                    "message": self.message,
+                    "current_value": self.current_value,
+                    "threshold": self.rule.threshold,
+                    "fired_at": self.fired_at.isoformat(),
+                    "status": self.status,
+                }
+            )
+        return self._json_payload
 
 
 class MonitoringAlertsService:
@@ -84,7 +122,11 @@ class MonitoringAlertsService:
     def __init__(self, settings: Settings, monitoring_service: MonitoringService):
         self.settings = settings
         self.monitoring = monitoring_service
-        self.alert_rules: List[AlertRule] = []
+        self.alert_rules: Dict[str, AlertRule] = {}
+        self._rule_evaluators: Dict[
+            str, Callable[[Dict[str, float]], Awaitable[None]]
+        ] = {}
+        self._last_observe_log: Dict[str, float] = {}
         self.active_alerts: Dict[str, Alert] = {}
         self.alert_history: List[Alert] = []
         self.notification_handlers: List[Callable] = []
@@ -99,8 +141,8 @@ class MonitoringAlertsService:
     def _setup_default_alert_rules(self):
         """Setup default alert rules for common issues."""
 
-        # High error rate alert
-        self.alert_rules.append(
+        default_rules = [
+            # High error rate alert
             AlertRule(
                 name="high_error_rate",
                 description="Error rate exceeds 5%",
@@ -109,11 +151,8 @@ class MonitoringAlertsService:
                 comparison="gt",
                 severity=AlertSeverity.WARNING,
                 duration_minutes=2,
-            )
-        )
-
-        # Critical error rate alert
-        self.alert_rules.append(
+            ),
+            # Critical error rate alert
             AlertRule(
                 name="critical_error_rate",
                 description="Error rate exceeds 15%",
@@ -122,11 +161,8 @@ class MonitoringAlertsService:
                 comparison="gt",
                 severity=AlertSeverity.CRITICAL,
                 duration_minutes=1,
-            )
-        )
-
-        # High response time alert
-        self.alert_rules.append(
+            ),
+            # High response time alert
             AlertRule(
                 name="high_response_time",
                 description="Average response time exceeds 5 seconds",
@@ -135,11 +171,8 @@ class MonitoringAlertsService:
                 comparison="gt",
                 severity=AlertSeverity.WARNING,
                 duration_minutes=3,
-            )
-        )
-
-        # Critical response time alert
-        self.alert_rules.append(
+            ),
+            # Critical response time alert
             AlertRule(
                 name="critical_response_time",
                 description="Average response time exceeds 10 seconds",
@@ -148,11 +181,8 @@ class MonitoringAlertsService:
                 comparison="gt",
                 severity=AlertSeverity.CRITICAL,
                 duration_minutes=1,
-            )
-        )
-
-        # Low success rate alert
-        self.alert_rules.append(
+            ),
+            # Low success rate alert
             AlertRule(
                 name="low_success_rate",
                 description="Success rate below 95%",
@@ -161,11 +191,8 @@ class MonitoringAlertsService:
                 comparison="lt",
                 severity=AlertSeverity.WARNING,
                 duration_minutes=5,
-            )
-        )
-
-        # AI service unavailable
-        self.alert_rules.append(
+            ),
+            # AI service unavailable
             AlertRule(
                 name="ai_service_down",
                 description="Azure OpenAI service unavailable",
@@ -174,11 +201,8 @@ class MonitoringAlertsService:
                 comparison="eq",
                 severity=AlertSeverity.CRITICAL,
                 duration_minutes=1,
-            )
-        )
-
-        # High token usage alert
-        self.alert_rules.append(
+            ),
+            # High token usage alert
             AlertRule(
                 name="high_token_usage",
                 description="Token usage exceeds 100k per hour",
@@ -187,14 +211,22 @@ class MonitoringAlertsService:
                 comparison="gt",
                 severity=AlertSeverity.INFO,
                 duration_minutes=10,
-            )
-        )
+            ),
+        ]
+
+        for rule in default_rules:
+            self._register_rule(rule)
 
         logger.info("Default alert rules configured", rules_count=len(self.alert_rules))
 
+    def _register_rule(self, rule: AlertRule):
+        """Store a rule together with its precompiled evaluator."""
+        self.alert_rules[rule.name] = rule
+        self._rule_evaluators[rule.name] = self._compile_rule_evaluator(rule)
+
     def add_alert_rule(self, rule: AlertRule):
-        """Add a custom alert rule."""
-        self.alert_rules.append(rule)
+        """Add a custom alert rule, replacing any existing rule with the same name."""
+        self._register_rule(rule)
         logger.info(
             "Alert rule added",
             rule_name=rule.name,
@@ -204,7 +236,10 @@ class MonitoringAlertsService:
 
     def remove_alert_rule(self, rule_name: str):
         """Remove an alert rule by name."""
-        self.alert_rules = [r for r in self.alert_rules if r.name != rule_name]
+        if self.alert_rules.pop(rule_name, None) is None:
+            return
+        self._rule_evaluators.pop(rule_name, None)
+        self._last_observe_log.pop(rule_name, None)
         logger.info("Alert rule removed", rule_name=rule_name)
 
     def add_notification_handler(self, handler: Callable[[Alert], None]):
@@ -256,8 +291,13 @@ class MonitoringAlertsService:
             )
 
             # Check each rule
-            for rule in self.alert_rules:
-                await self._evaluate_rule(rule, current_metrics)
+            for rule_name, evaluate in tuple(self._rule_evaluators.items()):
+                try:
+                    await evaluate(current_metrics)
+                except Exception as e:
+                    logger.error(
+                        "Failed to evaluate alert rule", rule_name=rule_name, error=str(e)
+                    )
 
         except Exception as e:
             logger.error("Failed to check alert rules", error=str(e))
@@ -268,18 +308,20 @@ class MonitoringAlertsService:
         """Calculate derived metrics for alert evaluation."""
         try:
             metrics = metrics_export.get("metrics", {})
-            counters = metrics.get("counters", {})
+            # Per-name totals, so this scans metric families rather than every
+            # tag combination
+            family_totals = metrics.get("family_totals", {})
             histograms = metrics.get("histogram_summaries", {})
 
             # Calculate error rate
             total_requests = sum(
                 count
-                for name, count in counters.items()
-                if "chat_requests_total" in str(name)
+                for name, count in family_totals.items()
+                if "chat_requests_total" in name
             )
 
             errors = sum(
-                count for name, count in counters.items() if "errors_total" in str(name)
+                count for name, count in family_totals.items() if "errors_total" in name
             )
 
             error_rate = (errors / total_requests * 100) if total_requests > 0 else 0.0
@@ -298,8 +340,8 @@ class MonitoringAlertsService:
             # Token usage per hour (simplified calculation)
             tokens_per_hour = sum(
                 count
-                for name, count in counters.items()
-                if "ai_tokens_used_total" in str(name)
+                for name, count in family_totals.items()
+                if "ai_tokens_used_total" in name
             )
 
             return {
@@ -316,22 +358,32 @@ class MonitoringAlertsService:
             logger.error("Failed to calculate derived metrics", error=str(e))
             return {}
 
-    async def _evaluate_rule(self, rule: AlertRule, current_metrics: Dict[str, float]):
-        """Evaluate a single alert rule."""
-        try:
-            metric_value = current_metrics.get(rule.metric_name)
+    def _compile_rule_evaluator(
+        self, rule: AlertRule
+    ) -> Callable[[Dict[str, float]], Awaitable[None]]:
+        """
+        Build a specialized evaluator for a single alert rule.
+
+        Everything that is constant for the rule (alert id, comparator,
+        threshold, duration) is resolved once here and captured by the
+        closure, so each monitoring tick only does the per-value work.
+        """
+        alert_id = f"{rule.name}_{rule.metric_name}"
+        rule_name = rule.name
+        metric_name = rule.metric_name
+        compare = _COMPARATORS.get(rule.comparison, _never_breached)
+        threshold = rule.threshold
+        duration_seconds = rule.duration_minutes * 60
+        fire_immediately = rule.severity == AlertSeverity.CRITICAL
+
+        async def evaluate(current_metrics: Dict[str, float]):
+            metric_value = current_metrics.get(metric_name)
             if metric_value is None:
                 return
 
-            # Check if threshold is breached
-            threshold_breached = self._check_threshold(
-                metric_value, rule.threshold, rule.comparison
-            )
-
-            alert_id = f"{rule.name}_{rule.metric_name}"
             existing_alert = self.active_alerts.get(alert_id)
 
-            if threshold_breached:
+            if compare(metric_value, threshold):
                 if existing_alert is None:
                     # Start tracking potential alert
                     alert = Alert(
@@ -340,60 +392,49 @@ class MonitoringAlertsService:
                         current_value=metric_value,
                         status=AlertStatus.ACTIVE,
                         fired_at=datetime.utcnow(),
-                        message=f"{rule.description}. Current value: {metric_value}, Threshold: {rule.threshold}",
+                        message=f"{rule.description}. Current value: {metric_value}, Threshold: {threshold}",
                     )
 
                     self.active_alerts[alert_id] = alert
 
                     # Fire alert immediately for critical issues
-                    if rule.severity == AlertSeverity.CRITICAL:
+                    if fire_immediately:
                         await self._fire_alert(alert)
+                        alert._notified = True
                     else:
-                        logger.info(
-                            "Alert condition detected, monitoring duration",
-                            rule_name=rule.name,
-                            current_value=metric_value,
-                            threshold=rule.threshold,
-                        )
+                        # Debounce: flapping rules would otherwise log every tick
+                        now = time.monotonic()
+                        last_logged = self._last_observe_log.get(rule_name)
+                        if (
+                            last_logged is None
+                            or now - last_logged >= _OBSERVE_LOG_INTERVAL_SECONDS
+                        ):
+                            self._last_observe_log[rule_name] = now
+                            logger.info(
+                                "Alert condition detected, monitoring duration",
+                                rule_name=rule_name,
+                                current_value=metric_value,
+                                threshold=threshold,
+                            )
                 else:
                     # Update existing alert
                     existing_alert.current_value = metric_value
 
                     # Check if alert should fire based on duration
-                    time_since_detection = datetime.utcnow() - existing_alert.fired_at
                     if (
-                        time_since_detection.total_seconds()
-                        >= rule.duration_minutes * 60
+                        existing_alert.status == AlertStatus.ACTIVE
+                        and not existing_alert._notified
+                        and (datetime.utcnow() - existing_alert.fired_at).total_seconds()
+                        >= duration_seconds
                     ):
-                        if existing_alert.status == AlertStatus.ACTIVE and not hasattr(
-                            existing_alert, "_notified"
-                        ):
-                            await self._fire_alert(existing_alert)
-                            existing_alert._notified = True
+                        await self._fire_alert(existing_alert)
+                        existing_alert._notified = True
             else:
                 # Threshold not breached - resolve alert if exists
                 if existing_alert and existing_alert.status == AlertStatus.ACTIVE:
                     await self._resolve_alert(existing_alert)
 
-        except Exception as e:
-            logger.error(
-                "Failed to evaluate alert rule", rule_name=rule.name, error=str(e)
-            )
-
-    def _check_threshold(self, value: float, threshold: float, comparison: str) -> bool:
-        """Check if a value breaches a threshold."""
-        if comparison == "gt":
-            return value > threshold
-        elif comparison == "gte":
-            return value >= threshold
-        elif comparison == "lt":
-            return value < threshold
-        elif comparison == "lte":
-            return value <= threshold
-        elif comparison == "eq":
-            return value == threshold
-        else:
-            return False
+        return evaluate
 
     async def _fire_alert(self, alert: Alert):
         """Fire an alert and send notifications."""
@@ -401,24 +442,22 @@ class MonitoringAlertsService:
             "Alert fired",
             alert_id=alert.id,
             rule_name=alert.rule.name,
-            severity=alert.rule.severity.value,
+            severity=alert.rule.severity,
             current_value=alert.current_value,
             threshold=alert.rule.threshold,
             message=alert.message,
         )
 
-        # Send notifications
+        # Send notifications (handlers share one serialized payload per fire)
+        alert._json_payload = None
         for handler in self.notification_handlers:
-            try:
-                await self._safe_notify(handler, alert)
-            except Exception as e:
-                logger.error("Notification handler failed", error=str(e))
+            await self._safe_notify(handler, alert)
 
         # Record business metric
         self.monitoring.record_business_metric(
             "alerts_fired_total",
             1.0,
-            tags={"severity": alert.rule.severity.value, "rule_name": alert.rule.name},
+            tags={"severity": alert.rule.severity, "rule_name": alert.rule.name},
         )
 
     async def _resolve_alert(self, alert: Alert):
@@ -473,19 +512,16 @@ class MonitoringAlertsService:
 
     async def get_alerts_summary(self) -> Dict[str, Any]:
         """Get a summary of the alerting system status."""
+        alerts_by_severity = dict.fromkeys(AlertSeverity, 0)
+        for alert in self.active_alerts.values():
+            alerts_by_severity[alert.rule.severity] += 1
+
         return {
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "monitoring_enabled": self._is_monitoring,
             "alert_rules_count": len(self.alert_rules),
             "active_alerts_count": len(self.active_alerts),
-            "alerts_by_severity": {
-                severity.value: sum(
-                    1
-                    for alert in self.active_alerts.values()
-                    if alert.rule.severity == severity
-                )
-                for severity in AlertSeverity
-            },
+            "alerts_by_severity": alerts_by_severity,
             "recent_alerts_count": len(self.alert_history),
             "notification_handlers_count": len(self.notification_handlers),
         }
@@ -498,7 +534,7 @@ async def log_notification_handler(alert: Alert):
         "ALERT NOTIFICATION",
         alert_id=alert.id,
         rule_name=alert.rule.name,
-        severity=alert.rule.severity.value,
+        severity=alert.rule.severity,
         message=alert.message,
         current_value=alert.current_value,
         threshold=alert.rule.threshold,
@@ -510,19 +546,13 @@ async def webhook_notification_handler(alert: Alert, webhook_url: str):
     import httpx
 
     try:
-        payload = {
-            "alert_id": alert.id,
-            "rule_name": alert.rule.name,
-            "severity": alert.rule.severity.value,
-            "message": alert.message,
-            "current_value": alert.current_value,
-            "threshold": alert.rule.threshold,
-            "fired_at": alert.fired_at.isoformat(),
-            "status": alert.status.value,
-        }
-
         async with httpx.AsyncClient() as client:
-            response = await client.post(webhook_url, json=payload, timeout=10)
+            response = await client.post(
+                webhook_url,
+                content=alert.to_json_bytes(),
+                headers={"Content-Type": "application/json"},
+                timeout=10,
+            )
             response.raise_for_status()
 
         logger.info("Alert sent to webhook", alert_id=alert.id, webhook=webhook_url)
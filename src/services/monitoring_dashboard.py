@@ -8,33 +8,32 @@ This module provides:
 - Business KPIs tracking
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import HTMLResponse
+import asyncio
+import gzip
+import hashlib
+import time
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator, Dict, Any, Optional, Set, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson
 import structlog
 
-from src.config.settings import Settings, get_settings_dependency
-from src.services.monitoring_service import get_monitoring_service
+from src.config.settings import get_settings_dependency
+from src.services.monitoring_service import (
+    MonitoringService,
+    get_monitoring_service,
+    orjson_default,
+)
 
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 
-@router.get("/dashboard")
-async def monitoring_dashboard() -> HTMLResponse:
-    """
-    HTML monitoring dashboard for real-time system observability.
-
-    Provides:
-    - System health overview
-    - Real-time metrics
-    - Performance charts
-    - Error tracking
-    """
-
-    dashboard_html = """
+# The dashboard is a static page, so it is encoded and fingerprinted once at import
+_DASHBOARD_HTML = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -405,31 +404,175 @@ async def monitoring_dashboard() -> HTMLResponse:
             // Initial load
             refreshMetrics();
             
-            // Auto-refresh every 30 seconds
-            setInterval(refreshMetrics, 30000);
+            // Live updates pushed by the server
+            const metricsStream = new EventSource('dashboard/api/stream');
+            metricsStream.addEventListener('metrics', (event) => {
+                updateDashboard(JSON.parse(event.data));
+            });
         </script>
     </body>
     </html>
     """
 
-    return HTMLResponse(content=dashboard_html, status_code=200)
 
 
-@router.get("/dashboard/api/metrics")
+def _minify_html(html: str) -> str:
+    """
+    Conservatively minify the embedded dashboard page.
+
+    Strips indentation, blank lines and whole-line ``//`` comments. Line
+    breaks are kept so inline JavaScript never depends on semicolon insertion.
+    """
+    lines = (line.strip() for line in html.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+_DASHBOARD_HTML_BYTES = _minify_html(_DASHBOARD_HTML).encode("utf-8")
+_DASHBOARD_HTML_GZIP = gzip.compress(_DASHBOARD_HTML_BYTES, compresslevel=9, mtime=0)
+_DASHBOARD_DIGEST = hashlib.sha256(_DASHBOARD_HTML_BYTES).hexdigest()[:16]
+_DASHBOARD_ETAG = f'"{_DASHBOARD_DIGEST}"'
+# Each content-coding is a distinct representation, so it needs its own ETag
+_DASHBOARD_ETAG_GZIP = f'"{_DASHBOARD_DIGEST}-gzip"'
+
+
+@lru_cache(maxsize=256)
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether an Accept-Encoding header allows a gzip response.
+
+    Honors q-values, so "gzip;q=0" refuses gzip and a "*" wildcard only
+    applies when gzip is not listed explicitly. Browsers send a handful of
+    distinct header values, so results are cached.
+    """
+    wildcard_q = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if coding == "*":
+            wildcard_q = q
+        else:
+            return q > 0
+
+    return wildcard_q is not None and wildcard_q > 0
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Evaluate If-None-Match against an ETag using weak comparison (RFC 9110).
+
+    Proxies and compressing CDNs may hand back a "W/"-prefixed validator,
+    which must still match the strong tag it was derived from.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+@router.get("/dashboard")
+async def monitoring_dashboard(request: Request) -> Response:
+    """
+    HTML monitoring dashboard for real-time system observability.
+
+    Provides:
+    - System health overview
+    - Real-time metrics
+    - Performance charts
+    - Error tracking
+    """
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = _DASHBOARD_ETAG_GZIP if use_gzip else _DASHBOARD_ETAG
+    headers = {
+        "Cache-Control": "public, max-age=300, must-revalidate",
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=_DASHBOARD_HTML_GZIP, media_type="text/html", headers=headers
+        )
+
+    return Response(content=_DASHBOARD_HTML_BYTES, media_type="text/html", headers=headers)
+
+
+_monitoring: Optional[MonitoringService] = None
+
+
+def _get_dashboard_monitoring() -> MonitoringService:
+    """Resolve the monitoring service once instead of on every dashboard poll."""
+    global _monitoring
+
+    if _monitoring is None:
+        _monitoring = get_monitoring_service(get_settings_dependency())
+
+    return _monitoring
+
+
+class _DashboardJSONResponse(ORJSONResponse):
+    """ORJSONResponse writing UTC datetimes with a "Z" suffix, like the rest of the API."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+
+
+# Every open dashboard tab polls the metrics API, so payloads are shared briefly
+_METRICS_CACHE_TTL_SECONDS = 10
+_TIMEFRAME_DELTAS = {
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "24h": timedelta(hours=24),
+}
+# Encoded response bodies: the summary holds live views of the collector, so
+# caching the payload object itself would not freeze the data
+_metrics_cache: Dict[str, Tuple[float, bytes]] = {}
+
+
+@router.get("/dashboard/api/metrics", response_class=_DashboardJSONResponse)
 async def dashboard_metrics_api(
-    settings: Settings = Depends(get_settings_dependency),
+    monitoring: MonitoringService = Depends(_get_dashboard_monitoring),
     timeframe: str = Query("1h", description="Timeframe for metrics (1h, 6h, 24h)"),
-) -> Dict[str, Any]:
+) -> Response:
     """
     API endpoint for dashboard metrics data.
 
+    Results are cached in memory per timeframe for a few seconds.
+
     Args:
         timeframe: Time window for metrics aggregation
 
     Returns:
         JSON containing dashboard metrics
     """
-    monitoring = get_monitoring_service(settings)
+    cache_headers = {"Cache-Control": f"public, max-age={_METRICS_CACHE_TTL_SECONDS}"}
+
+    cached = _metrics_cache.get(timeframe)
+    if cached is not None and time.monotonic() - cached[0] < _METRICS_CACHE_TTL_SECONDS:
+        return Response(
+            content=cached[1], media_type="application/json", headers=cache_headers
+        )
 
     try:
         # Get current metrics
@@ -437,30 +580,24 @@ async def dashboard_metrics_api(
         metrics_export = await monitoring.get_metrics_export()
 
         # Calculate timeframe-specific metrics
-        now = datetime.utcnow()
-        if timeframe == "1h":
-            time_window = now - timedelta(hours=1)
-        elif timeframe == "6h":
-            time_window = now - timedelta(hours=6)
-        elif timeframe == "24h":
-            time_window = now - timedelta(hours=24)
-        else:
-            time_window = now - timedelta(hours=1)
+        now = datetime.now(timezone.utc)
+        time_window = now - _TIMEFRAME_DELTAS.get(timeframe, _TIMEFRAME_DELTAS["1h"])
 
-        return {
-            "timestamp": now.isoformat() + "Z",
+        payload = {
+            "timestamp": now,
             "timeframe": timeframe,
-            "time_window": time_window.isoformat() + "Z",
+            "time_window": time_window,
             "system_health": health_metrics,
             "metrics": metrics_export.get("metrics", {}),
             "summary": {
-                "total_requests": _calculate_total_requests(metrics_export),
-                "error_rate": _calculate_error_rate(metrics_export),
-                "avg_response_time": _calculate_avg_response_time(metrics_export),
-                "active_sessions": _calculate_active_sessions(metrics_export),
+                **_compute_summary(metrics_export),
                 "uptime_hours": health_metrics.get("uptime_hours", 0),
             },
         }
+        response = _DashboardJSONResponse(payload, headers=cache_headers)
+        if timeframe in _TIMEFRAME_DELTAS:
+            _metrics_cache[timeframe] = (time.monotonic(), response.body)
+        return response
 
     except Exception as e:
         logger.error("Failed to get dashboard metrics", error=str(e))
@@ -469,51 +606,122 @@ async def dashboard_metrics_api(
         )
 
 
-def _calculate_total_requests(metrics_export: Dict[str, Any]) -> int:
-    """Calculate total requests from metrics."""
-    try:
-        counters = metrics_export.get("metrics", {}).get("counters", {})
-        return sum(
-            count
-            for name, count in counters.items()
-            if "chat_requests_total" in str(name)
-        )
-    except (KeyError, TypeError, AttributeError):
-        return 0
+# Seconds between aggregated metric pushes to dashboard stream subscribers
+_STREAM_INTERVAL_SECONDS = 5
+_stream_subscribers: Set["asyncio.Queue[str]"] = set()
+_stream_task: Optional["asyncio.Task[None]"] = None
 
 
-def _calculate_error_rate(metrics_export: Dict[str, Any]) -> float:
-    """Calculate error rate percentage."""
-    try:
-        counters = metrics_export.get("metrics", {}).get("counters", {})
-        total_requests = _calculate_total_requests(metrics_export)
-        errors = sum(
-            count for name, count in counters.items() if "errors_total" in str(name)
-        )
-        return (errors / total_requests * 100) if total_requests > 0 else 0.0
-    except (KeyError, TypeError, AttributeError, ZeroDivisionError):
-        return 0.0
+async def _publish_metrics(monitoring: MonitoringService):
+    """Aggregate metrics once per interval and fan the result out to all subscribers."""
+    while _stream_subscribers:
+        try:
+            data = orjson.dumps(
+                await monitoring.get_metrics_report(), default=orjson_default
+            ).decode()
+        except Exception as e:
+            logger.error("Failed to build dashboard stream payload", error=str(e))
+        else:
+            for queue in _stream_subscribers:
+                # Subscribers only need the latest snapshot
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(data)
 
+        await asyncio.sleep(_STREAM_INTERVAL_SECONDS)
 
-def _calculate_avg_response_time(metrics_export: Dict[str, Any]) -> float:
-    """Calculate average response time."""
-    try:
-        histograms = metrics_export.get("metrics", {}).get("histogram_summaries", {})
-        for name, hist in histograms.items():
-            if "response_time" in str(name) or "duration" in str(name):
-                return hist.get("avg", 0.0)
-        return 0.0
-    except (KeyError, TypeError, AttributeError):
-        return 0.0
+
+@router.get("/dashboard/api/stream")
+async def dashboard_metrics_stream(
+    monitoring: MonitoringService = Depends(_get_dashboard_monitoring),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of dashboard metrics.
+
+    A single background task aggregates metrics for all connected clients,
+    instead of every open dashboard polling the metrics API.
+    """
+
+    async def event_stream() -> AsyncGenerator[str, None]:
+        global _stream_task
+
+        queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=1)
+        _stream_subscribers.add(queue)
+        if _stream_task is None or _stream_task.done():
+            _stream_task = asyncio.create_task(_publish_metrics(monitoring))
+
+        try:
+            while True:
+                data = await queue.get()
+                yield f"event: metrics\ndata: {data}\n\n"
+        finally:
+            _stream_subscribers.discard(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+# Summary buckets keyed by bare metric (family) name
+_COUNTER_CLASSES = {
+    "chat_requests_total": "requests",
+    "errors_total": "errors",
+    "operation_errors_total": "errors",
+    "ai_tokens_used_total": "tokens",
+    "search_queries_total": "searches",
+}
+_RESPONSE_TIME_HISTOGRAMS = frozenset(
+    {"chat_response_time_ms", "operation_duration_ms", "search_duration_ms"}
+)
+_ACTIVE_SESSIONS_GAUGE = "active_sessions"
 
 
-def _calculate_active_sessions(metrics_export: Dict[str, Any]) -> int:
-    """Calculate active sessions estimate."""
+@lru_cache(maxsize=4096)
+def _metric_base_name(key: str) -> str:
+    """Strip the "[tags]" suffix from a metric key (keys recur on every poll)."""
+    return key.partition("[")[0]
+
+
+def _compute_summary(metrics_export: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the dashboard summary in a single pass over the exported metrics.
+
+    Returns:
+        Dictionary with total_requests, error_rate, avg_response_time and
+        active_sessions
+    """
+    total_requests = 0
+    errors = 0
+    avg_response_time = 0.0
+    active_sessions = 0
+
     try:
-        gauges = metrics_export.get("metrics", {}).get("gauges", {})
-        for name, value in gauges.items():
-            if "active_sessions" in str(name):
-                return int(value)
-        return 0
+        metrics = metrics_export.get("metrics", {})
+
+        for name, count in metrics.get("family_totals", {}).items():
+            bucket = _COUNTER_CLASSES.get(name)
+            if bucket == "requests":
+                total_requests += count
+            elif bucket == "errors":
+                errors += count
+
+        for name, hist in metrics.get("histogram_summaries", {}).items():
+            if _metric_base_name(name) in _RESPONSE_TIME_HISTOGRAMS:
+                avg_response_time = hist.get("avg", 0.0)
+                break
+
+        for name, value in metrics.get("gauges", {}).items():
+            if _metric_base_name(name) == _ACTIVE_SESSIONS_GAUGE:
+                active_sessions = int(value)
+                break
     except (KeyError, TypeError, AttributeError, ValueError):
-        return 0
+        pass
+
+    return {
+        "total_requests": total_requests,
+        "error_rate": (errors / total_requests * 100) if total_requests > 0 else 0.0,
+        "avg_response_time": avg_response_time,
+        "active_sessions": active_sessions,
+    }
@@ -4,22 +4,25 @@ Handles request/response logging, performance metrics, and error tracking.
 Optional FastAPI integration with fallback for non-FastAPI environments.
 """
 
+import itertools
+import logging
+import os
+import random
 import time
-from typing import TYPE_CHECKING, Callable, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
 
 if TYPE_CHECKING:
     from fastapi import Request, Response
-    from fastapi.middleware.base import BaseHTTPMiddleware
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
 else:
     # Fallback types when FastAPI is not available
     Request = None
     Response = None
-    BaseHTTPMiddleware = None
 
 # Import FastAPI components conditionally
 try:
     from fastapi import FastAPI, Request, Response
-    from fastapi.middleware.base import BaseHTTPMiddleware
+    from starlette.datastructures import Headers, MutableHeaders
     import structlog
 
     FASTAPI_AVAILABLE = True
@@ -37,11 +40,6 @@ except ImportError:
 
         pass
 
-    class BaseHTTPMiddleware:
-        """Fallback BaseHTTPMiddleware class."""
-
-        pass
-
     class FastAPI:
         """Fallback FastAPI class."""
 
@@ -60,16 +58,57 @@ except ImportError:
 
     structlog = MockLogger()
 
-from src.services.logging_service import get_logger
 from src.services.monitoring_service import get_monitoring_service
 from src.config.settings import get_settings_dependency
 
-logger = get_logger(__name__)
+logger = structlog.get_logger()
+_stdlib_logger = logging.getLogger(__name__)
+
+# Request IDs are a per-process random prefix plus a counter, so only one
+# urandom read happens per process rather than one per request. The pid alone
+# is not enough: containerized workers commonly all run as pid 1.
+_REQUEST_ID_PREFIX = ""
+_request_counter = itertools.count()
+
+
+def _reset_request_id_prefix() -> None:
+    """Pick a fresh request ID prefix (at import and in forked workers)."""
+    global _REQUEST_ID_PREFIX, _request_counter
+    _REQUEST_ID_PREFIX = f"{os.urandom(6).hex()}{os.getpid():x}"
+    _request_counter = itertools.count()
+
 
+_reset_request_id_prefix()
+os.register_at_fork(after_in_child=_reset_request_id_prefix)
+
+
+def _new_request_id() -> str:
+    """Generate a request ID that is unique across processes and hosts."""
+    return f"{_REQUEST_ID_PREFIX}-{next(_request_counter):x}"
+
+
+_UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _route_path(scope: "Scope") -> str:
+    """
+    Get the matched route template (e.g. "/sessions/{session_id}") for metric labels.
 
-class MonitoringMiddleware(BaseHTTPMiddleware):
+    Raw paths with IDs would create a new metric series per request; the
+    router stores the matched route in the scope once the request is handled.
+    Requests that matched no route (404s, scanners) share one
+    "<unmatched>" label so arbitrary paths cannot grow the metric tables.
     """
-    FastAPI middleware for automatic request monitoring and metrics collection.
+    route = scope.get("route")
+    return getattr(route, "path", None) or _UNMATCHED_ROUTE
+
+
+class MonitoringMiddleware:
+    """
+    ASGI middleware for automatic request monitoring and metrics collection.
+
+    Implemented at the raw ASGI level rather than on BaseHTTPMiddleware to
+    avoid the extra task group and response streaming wrapper per request.
 
     Tracks:
     - Request count and response status codes
@@ -78,10 +117,26 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
     - Business metrics and user analytics
     """
 
-    def __init__(self, app):
-        super().__init__(app)
+    # High-frequency probe/static paths that are passed straight through
+    _EXCLUDED_PATHS = frozenset(
+        {
+            "/api/v1/health",
+            "/api/v1/health/live",
+            "/api/v1/health/ready",
+            "/monitoring/dashboard",
+            "/metrics",
+            "/favicon.ico",
+        }
+    )
+
+    def __init__(self, app: "ASGIApp"):
+        self.app = app
         self._monitoring = None
         self._settings = None
+        # Per-(method, route, status) chat request recorders with prebuilt metric keys
+        self._chat_recorders: Dict[Tuple[str, str, str], Callable[[float], None]] = {}
+        # Per-(method, route) operation duration recorders used when not tracing
+        self._operation_recorders: Dict[Tuple[str, str], Callable[[float], None]] = {}
 
     @property
     def monitoring(self):
@@ -92,63 +147,108 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
             self._monitoring = get_monitoring_service(self._settings)
         return self._monitoring
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def _operation_recorder(self, method: str, route: str) -> Callable[[float], None]:
+        """Get the cached operation_duration_ms recorder for a route."""
+        recorder = self._operation_recorders.get((method, route))
+        if recorder is None:
+            recorder = self.monitoring.metrics.histogram_recorder(
+                "operation_duration_ms", {"operation": f"{method} {route}"}
+            )
+            self._operation_recorders[(method, route)] = recorder
+        return recorder
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
         """Process request and collect monitoring metrics."""
-        start_time = time.time()
+        if scope["type"] != "http" or scope["path"] in self._EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
 
         # Extract request information
-        method = request.method
-        path = request.url.path
-        endpoint = f"{method} {path}"
+        method = scope["method"]
+        path = scope["path"]
 
-        # Generate request ID for tracing
-        request_id = getattr(request.state, "request_id", None)
+        # Generate request ID for tracing (shared with request.state)
+        state = scope.setdefault("state", {})
+        request_id = state.get("request_id")
         if not request_id:
-            import uuid
+            request_id = _new_request_id()
+            state["request_id"] = request_id
 
-            request_id = str(uuid.uuid4())
-            request.state.request_id = request_id
+        # Only build log events when they will actually be emitted
+        verbose = _stdlib_logger.isEnabledFor(logging.INFO)
 
         # Log request start
-        logger.info(
-            "Request started",
-            method=method,
-            path=path,
-            request_id=request_id,
-            user_agent=request.headers.get("user-agent", "unknown"),
-            client_host=request.client.host if request.client else "unknown",
-        )
+        if verbose:
+            client = scope.get("client")
+            logger.info(
+                "Request started",
+                method=method,
+                path=path,
+                request_id=request_id,
+                user_agent=Headers(scope=scope).get("user-agent", "unknown"),
+                client_host=client[0] if client else "unknown",
+            )
 
-        # Process request and handle errors
-        response = None
-        error_occurred = False
-        error_type = None
+        status_code = 500
+        response_started = False
 
-        try:
-            # Use monitoring context for request tracing
-            async with self.monitoring.trace_request(
-                operation_name=endpoint, request_id=request_id, method=method, path=path
-            ) as trace_context:
-                # Add trace context to request state
-                request.state.trace_context = trace_context
+        async def send_wrapper(message: "Message") -> None:
+            nonlocal status_code, response_started
+
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+
+                # Add monitoring headers to response
+                response_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                headers.append("X-Response-Time", f"{response_time_ms:.2f}ms")
 
-                # Call the actual endpoint
-                response = await call_next(request)
+            await send(message)
 
-                # Determine status from response
-                status_code = response.status_code
-                status = "success" if 200 <= status_code < 400 else "error"
+        try:
+            if self.monitoring.app_insights_enabled:
+                # Use monitoring context for request tracing
+                async with self.monitoring.trace_request(
+                    operation_name=f"{method} {path}",
+                    request_id=request_id,
+                    method=method,
+                    path=path,
+                ) as trace_context:
+                    # Add trace context to request state
+                    state["trace_context"] = trace_context
+
+                    # Call the actual endpoint
+                    await self.app(scope, receive, send_wrapper)
+            else:
+                # No trace exporter configured, so skip the tracing context but
+                # keep the in-memory operation metrics the dashboard reads
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                except Exception as e:
+                    self.monitoring.metrics.increment_counter(
+                        "operation_errors_total",
+                        tags={
+                            "operation": f"{method} {_route_path(scope)}",
+                            "error_type": type(e).__name__,
+                        },
+                    )
+                    raise
+                finally:
+                    self._operation_recorder(method, _route_path(scope))(
+                        (time.perf_counter_ns() - start_ns) / 1_000_000
+                    )
 
         except Exception as e:
-            error_occurred = True
             error_type = type(e).__name__
-            status = "error"
-            status_code = 500
 
             # Record error metrics
             self.monitoring.record_error(
                 error_type=error_type,
-                endpoint=endpoint,
+                endpoint=f"{method} {_route_path(scope)}",
                 error_message=str(e),
                 user_id=request_id,
             )
@@ -165,27 +265,21 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
             # Re-raise the exception to be handled by FastAPI
             raise
 
-        finally:
-            # Calculate response time
-            end_time = time.time()
-            response_time_ms = (end_time - start_time) * 1000
+        # Calculate response time
+        response_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
-            if not error_occurred and response:
-                status_code = response.status_code
-                status = "success" if 200 <= status_code < 400 else "error"
+        if response_started:
+            status = "success" if 200 <= status_code < 400 else "error"
 
-                # Record successful request metrics
-                self.monitoring.record_chat_request(
-                    endpoint=endpoint,
-                    status=status,
-                    response_time_ms=response_time_ms,
-                    user_id=request_id,
-                )
-
-                # Add monitoring headers to response
-                response.headers["X-Request-ID"] = request_id
-                response.headers["X-Response-Time"] = f"{response_time_ms:.2f}ms"
+            # Record successful request metrics, labelled by route template
+            label = (method, _route_path(scope), status)
+            recorder = self._chat_recorders.get(label)
+            if recorder is None:
+                recorder = self.monitoring.get_chat_request_recorder(*label)
+                self._chat_recorders[label] = recorder
+            recorder(response_time_ms)
 
+            if verbose:
                 logger.info(
                     "Request completed",
                     method=method,
@@ -195,8 +289,6 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
                     response_time_ms=response_time_ms,
                 )
 
-        return response
-
 
 def add_monitoring_middleware(app: FastAPI):
     """
@@ -212,8 +304,10 @@ def add_monitoring_middleware(app: FastAPI):
 class ChatMetricsCollector:
     """Specialized metrics collector for chat-specific business KPIs."""
 
-    def __init__(self, monitoring_service):
+    def __init__(self, monitoring_service, log_sample_rate: float = 0.05):
         self.monitoring = monitoring_service
+        # Fraction of chat interactions whose analytics log is emitted
+        self.log_sample_rate = log_sample_rate
 
     def record_chat_interaction(
         self,
@@ -244,32 +338,31 @@ class ChatMetricsCollector:
             user_id=session_id,
         )
 
-        # Record business-specific metrics
-        self.monitoring.record_business_metric(
-            "message_length_chars", len(user_message), tags={"type": "user_input"}
-        )
-
-        self.monitoring.record_business_metric(
-            "response_length_chars", len(ai_response), tags={"type": "ai_response"}
-        )
+        user_message_length = len(user_message)
+        ai_response_length = len(ai_response)
 
+        # Record business-specific metrics
+        samples = [
+            ("message_length_chars", user_message_length, {"type": "user_input"}),
+            ("response_length_chars", ai_response_length, {"type": "ai_response"}),
+        ]
         if user_satisfaction:
-            self.monitoring.record_business_metric(
-                "user_satisfaction_score",
-                user_satisfaction,
-                tags={"session_type": "chat"},
+            samples.append(
+                ("user_satisfaction_score", user_satisfaction, {"session_type": "chat"})
+            )
+        self.monitoring.record_business_metrics_batch(samples)
+
+        # Log chat analytics (sampled; the metrics above are always recorded)
+        if random.random() < self.log_sample_rate:
+            logger.info(
+                "Chat interaction completed",
+                session_id=session_id,
+                user_message_length=user_message_length,
+                ai_response_length=ai_response_length,
+                response_time_ms=response_time_ms,
+                tokens_used=token_usage.get("total_tokens", 0),
+                user_satisfaction=user_satisfaction,
             )
-
-        # Log chat analytics
-        logger.info(
-            "Chat interaction completed",
-            session_id=session_id,
-            user_message_length=len(user_message),
-            ai_response_length=len(ai_response),
-            response_time_ms=response_time_ms,
-            tokens_used=token_usage.get("total_tokens", 0),
-            user_satisfaction=user_satisfaction,
-        )
 
     def record_rag_search(
         self, query: str, documents_found: int, search_time_ms: float, session_id: str
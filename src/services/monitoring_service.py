@@ -9,20 +9,148 @@ This service provides:
 - Azure Application Insights integration (when available)
 """
 
+import asyncio
+import logging
+import math
 import time
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Callable, Deque, Dict, Any, FrozenSet, List, Optional, Tuple
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from types import MappingProxyType
 import hashlib
 from collections import defaultdict, deque
 
+import orjson
 import structlog
 
 from src.config.settings import Settings
 
 
 logger = structlog.get_logger()
+# Level checks for hot-path events, so skipped logs build no event dicts
+_stdlib_logger = logging.getLogger(__name__)
+
+
+# Bounds for MetricsCollector's serialized key cache
+_KEY_CACHE_SIZE = 4096
+_KEY_CACHE_MAX_TAGS = 8
+
+
+def orjson_default(obj: Any) -> Any:
+    """orjson fallback for the read-only mapping views in metrics summaries."""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _hash_identifier_uncached(identifier: str) -> str:
+    """
+    Short privacy-preserving hash of an identifier.
+
+    Only used to correlate log events, so BLAKE2s (fast on short inputs) with a
+    4-byte digest is enough; the output is still 8 hex characters.
+    """
+    return hashlib.blake2s(identifier.encode(), digest_size=4).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _hash_identifier(identifier: str) -> str:
+    """
+    Hash a recurring user or session ID.
+
+    Cached on the str itself, so repeat users skip both the encode() and the
+    digest; only a miss allocates the bytes.
+    """
+    return _hash_identifier_uncached(identifier)
+
+
+# Queued chat events are applied to the collector in batches of this size
+_CHAT_EVENT_BATCH_SIZE = 256
+_TOKEN_TYPES = frozenset({"prompt_tokens", "completion_tokens", "total_tokens"})
+
+# Collectors with more series than this are summarized off the event loop
+_SUMMARY_INLINE_MAX_SERIES = 1000
+
+# Raw samples kept per histogram (for distribution stats)
+_HISTOGRAM_WINDOW = 1000
+_PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+_EMPTY_PERCENTILES = {label: 0 for label, _ in _PERCENTILES}
+
+
+class _HistogramState:
+    """Running aggregates for one histogram plus a bounded window of raw samples."""
+
+    __slots__ = (
+        "count",
+        "sum",
+        "min",
+        "max",
+        "samples",
+        "_percentiles",
+        "_percentiles_at",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.samples: Deque[float] = deque(maxlen=_HISTOGRAM_WINDOW)
+        # Percentiles from the last summary and the sample count they were built at
+        self._percentiles: Dict[str, float] = _EMPTY_PERCENTILES
+        self._percentiles_at = 0
+
+    def add(self, value: float):
+        """Fold one sample into the aggregates in O(1)."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.samples.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        """Summarize the histogram, with percentiles over the sample window."""
+        if not self.count:
+            return {"count": 0, "avg": 0, "min": 0, "max": 0, **_EMPTY_PERCENTILES}
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count,
+            "min": self.min,
+            "max": self.max,
+            **self.percentiles(),
+        }
+
+    def percentiles(self) -> Dict[str, float]:
+        """
+        Nearest-rank percentiles of the retained samples (one C-level sort).
+
+        Results are reused until new samples arrive, so repeated exports only
+        sort the histograms that actually changed.
+        """
+        count = self.count
+        if count == self._percentiles_at:
+            return self._percentiles
+
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        self._percentiles = {
+            label: ordered[min(n - 1, max(0, math.ceil(q * n) - 1))]
+            for label, q in _PERCENTILES
+        }
+        self._percentiles_at = count
+        return self._percentiles
+
+
+def _bounded_put(cache: Dict[Any, Any], key: Any, value: Any):
+    """Insert into a size-capped cache, evicting the oldest entry when full."""
+    if len(cache) >= _KEY_CACHE_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest
+        del cache[next(iter(cache))]
+    cache[key] = value
 
 
 class MetricsCollector:
@@ -30,9 +158,15 @@ class MetricsCollector:
 
     def __init__(self):
         self.counters = defaultdict(int)
-        self.histograms = defaultdict(lambda: deque(maxlen=1000))
+        self.histograms: Dict[str, _HistogramState] = defaultdict(_HistogramState)
         self.gauges = defaultdict(float)
-        self.start_time = datetime.utcnow()
+        # Running totals per counter name across all tag combinations
+        self.family_totals: Dict[str, int] = defaultdict(int)
+        self.start_time = time.monotonic()
+        # Serialized metric keys by (name, tag set); callers repeat the same tags
+        self._key_cache: Dict[Tuple[str, FrozenSet[Tuple[str, Any]]], str] = {}
+        # Canonical "k=v,..." strings by tag set, shared by every metric name
+        self._tag_strings: Dict[FrozenSet[Tuple[str, Any]], str] = {}
 
     def increment_counter(
         self, name: str, value: int = 1, tags: Optional[Dict[str, str]] = None
@@ -40,13 +174,39 @@ class MetricsCollector:
         """Increment a counter metric."""
         key = self._make_key(name, tags)
         self.counters[key] += value
+        self.family_totals[name] += value
 
     def record_histogram(
         self, name: str, value: float, tags: Optional[Dict[str, str]] = None
     ):
         """Record a histogram value."""
+        self._record_histogram_key(self._make_key(name, tags), value)
+
+    def _record_histogram_key(self, key: str, value: float):
+        """Record a histogram value under an already-built metric key."""
+        self.histograms[key].add(value)
+
+    def counter_incrementer(
+        self, name: str, tags: Optional[Dict[str, str]] = None
+    ) -> Callable[[int], None]:
+        """Get a function that increments one counter, with its key built once."""
         key = self._make_key(name, tags)
-        self.histograms[key].append({"value": value, "timestamp": datetime.utcnow()})
+        counters = self.counters
+        family_totals = self.family_totals
+
+        def increment(value: int = 1):
+            counters[key] += value
+            family_totals[name] += value
+
+        return increment
+
+    def histogram_recorder(
+        self, name: str, tags: Optional[Dict[str, str]] = None
+    ) -> Callable[[float], None]:
+        """Get a function that records into one histogram, with its key built once."""
+        # Histogram states are never replaced, so the recorder can bind the
+        # slotted state directly and skip the dict lookup on every sample
+        return self.histograms[self._make_key(name, tags)].add
 
     def set_gauge(self, name: str, value: float, tags: Optional[Dict[str, str]] = None):
         """Set a gauge value."""
@@ -57,26 +217,84 @@ class MetricsCollector:
         """Create a unique key for the metric."""
         if not tags:
             return name
-        tag_str = ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
-        return f"{name}[{tag_str}]"
+        if len(tags) > _KEY_CACHE_MAX_TAGS:
+            return self._build_key(name, tags)
+
+        try:
+            tag_set = frozenset(tags.items())
+        except TypeError:
+            # Unhashable tag values cannot be cached
+            return self._build_key(name, tags)
+
+        cache_key = (name, tag_set)
+        key = self._key_cache.get(cache_key)
+        if key is None:
+            # The sort only runs the first time a tag set is seen, whatever
+            # metric it is attached to
+            tag_str = self._tag_strings.get(tag_set)
+            if tag_str is None:
+                tag_str = self._format_tags(tags)
+                _bounded_put(self._tag_strings, tag_set, tag_str)
+            key = f"{name}[{tag_str}]"
+            _bounded_put(self._key_cache, cache_key, key)
+        return key
+
+    @classmethod
+    def _build_key(cls, name: str, tags: Dict[str, str]) -> str:
+        """Serialize a metric name and its tags into a key string."""
+        return f"{name}[{cls._format_tags(tags)}]"
+
+    @staticmethod
+    def _format_tags(tags: Dict[str, str]) -> str:
+        """Format tags canonically (sorted by tag name)."""
+        # Every call site passes at most three tags, so unroll those cases
+        # rather than driving a generator through join
+        size = len(tags)
+        if size == 1:
+            ((k1, v1),) = tags.items()
+            return f"{k1}={v1}"
+        if size == 2:
+            (k1, v1), (k2, v2) = sorted(tags.items())
+            return f"{k1}={v1},{k2}={v2}"
+        if size == 3:
+            (k1, v1), (k2, v2), (k3, v3) = sorted(tags.items())
+            return f"{k1}={v1},{k2}={v2},{k3}={v3}"
+        return ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
+
+    def get_sizes(self) -> Tuple[int, int, int]:
+        """Get the number of (counter, gauge, histogram) series without copying them."""
+        return len(self.counters), len(self.gauges), len(self.histograms)
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize the metrics summary straight to JSON bytes with orjson."""
+        return orjson.dumps(self.get_metrics_summary(), default=orjson_default)
+
+    async def get_metrics_summary_async(self) -> Dict[str, Any]:
+        """
+        Get the metrics summary without stalling the event loop on large collectors.
+
+        Small collectors are summarized inline; past about a thousand series the
+        percentile sorts are moved to a worker thread.
+        """
+        if sum(self.get_sizes()) <= _SUMMARY_INLINE_MAX_SERIES:
+            return self.get_metrics_summary()
+        return await asyncio.to_thread(self.get_metrics_summary)
 
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get a summary of all collected metrics."""
         return {
-            "counters": dict(self.counters),
-            "gauges": dict(self.gauges),
+            # Read-only live views rather than copies; serializers copy them
+            # at the JSON boundary (see orjson_default)
+            "counters": MappingProxyType(self.counters),
+            "family_totals": MappingProxyType(self.family_totals),
+            "gauges": MappingProxyType(self.gauges),
             "histogram_summaries": {
-                name: {
-                    "count": len(values),
-                    "avg": sum(v["value"] for v in values) / len(values)
-                    if values
-                    else 0,
-                    "min": min(v["value"] for v in values) if values else 0,
-                    "max": max(v["value"] for v in values) if values else 0,
-                }
-                for name, values in self.histograms.items()
+                # Iterate a snapshot: this may run in a worker thread while the
+                # event loop registers new histograms
+                name: histogram.summary()
+                for name, histogram in list(self.histograms.items())
             },
-            "uptime_seconds": (datetime.utcnow() - self.start_time).total_seconds(),
+            "uptime_seconds": time.monotonic() - self.start_time,
         }
 
 
@@ -91,9 +309,20 @@ class MonitoringService:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.metrics = MetricsCollector()
-
-        # Track application start time
-        self.start_time = datetime.utcnow()
+        # Chat request recorders with prebuilt metric keys, by (endpoint, status)
+        self._chat_recorders: Dict[Tuple[str, str], Callable[[float], None]] = {}
+        # Request counter and response time recorder for each (endpoint, status)
+        self._chat_series: Dict[
+            Tuple[str, str], Tuple[Callable[[int], None], Callable[[float], None]]
+        ] = {}
+        # Chat events waiting to be applied in one batch:
+        # (endpoint, status, response_time_ms, token_usage)
+        self._chat_events: Deque[
+            Tuple[str, str, float, Optional[Dict[str, int]]]
+        ] = deque()
+
+        # Track application start time (monotonic, for uptime)
+        self.start_time = time.monotonic()
 
         # Initialize Application Insights if configured
         self.app_insights_enabled = bool(
@@ -127,51 +356,54 @@ class MonitoringService:
             operation_name: Name of the operation being traced
             **properties: Additional properties to attach to the trace
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         trace_id = str(uuid.uuid4())
 
-        logger.info(
-            "Operation started",
-            operation=operation_name,
-            trace_id=trace_id,
-            **properties,
-        )
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Operation started",
+                operation=operation_name,
+                trace_id=trace_id,
+                **properties,
+            )
 
+        error: Optional[Exception] = None
         try:
             yield {"trace_id": trace_id, "operation": operation_name}
         except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-
+            error = e
             # Record error metrics
             self.metrics.increment_counter(
                 "operation_errors_total",
                 tags={"operation": operation_name, "error_type": type(e).__name__},
             )
-
-            logger.error(
-                "Operation failed",
-                operation=operation_name,
-                trace_id=trace_id,
-                duration_ms=duration_ms,
-                error=str(e),
-                **properties,
-            )
             raise
         finally:
-            duration_ms = (time.time() - start_time) * 1000
+            # Measured once for both the metric and the single outcome event
+            duration_ms = (time.perf_counter() - start_time) * 1000
 
             # Record timing metrics
             self.metrics.record_histogram(
                 "operation_duration_ms", duration_ms, tags={"operation": operation_name}
             )
 
-            logger.info(
-                "Operation completed",
-                operation=operation_name,
-                trace_id=trace_id,
-                duration_ms=duration_ms,
-                **properties,
-            )
+            if error is not None:
+                logger.error(
+                    "Operation failed",
+                    operation=operation_name,
+                    trace_id=trace_id,
+                    duration_ms=duration_ms,
+                    error=str(error),
+                    **properties,
+                )
+            elif _stdlib_logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Operation completed",
+                    operation=operation_name,
+                    trace_id=trace_id,
+                    duration_ms=duration_ms,
+                    **properties,
+                )
 
     def record_chat_request(
         self,
@@ -191,43 +423,113 @@ class MonitoringService:
             token_usage: Token usage breakdown
             user_id: User identifier (hashed for privacy)
         """
-        # Record request count
-        self.metrics.increment_counter(
-            "chat_requests_total", tags={"endpoint": endpoint, "status": status}
-        )
+        # Queue the metric update; events are applied in batches, either when
+        # enough have accumulated or before metrics are read
+        self._chat_events.append((endpoint, status, response_time_ms, token_usage))
+        if len(self._chat_events) >= _CHAT_EVENT_BATCH_SIZE:
+            self._apply_chat_events()
 
-        # Record response time
-        self.metrics.record_histogram(
-            "chat_response_time_ms", response_time_ms, tags={"endpoint": endpoint}
-        )
+        # Log business metrics
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Chat request completed",
+                endpoint=endpoint,
+                status=status,
+                response_time_ms=response_time_ms,
+                token_usage=token_usage,
+                # Hash user ID for privacy
+                user_id_hash=_hash_identifier(user_id) if user_id else None,
+            )
 
-        # Record token usage if provided
-        if token_usage:
-            for token_type, count in token_usage.items():
-                if token_type in ["prompt_tokens", "completion_tokens", "total_tokens"]:
-                    self.metrics.increment_counter(
-                        "ai_tokens_used_total",
-                        value=count,
-                        tags={
-                            "model": str(token_usage.get("model", "unknown")),
-                            "type": token_type,
-                        },
-                    )
-
-        # Hash user ID for privacy
-        user_hash = None
-        if user_id:
-            user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
+    def _apply_chat_events(self):
+        """Apply queued chat events, coalescing token counter increments."""
+        events = self._chat_events
+        if not events:
+            return
+
+        # Endpoints and statuses form a small, bounded grid, so group the
+        # batch by cell and bump each request counter once
+        response_times: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        token_totals: Dict[Tuple[str, str], int] = defaultdict(int)
+        while events:
+            endpoint, status, response_time_ms, token_usage = events.popleft()
+            response_times[(endpoint, status)].append(response_time_ms)
+
+            # Record token usage if provided
+            if token_usage:
+                model = str(token_usage.get("model", "unknown"))
+                for token_type, count in token_usage.items():
+                    if token_type in _TOKEN_TYPES:
+                        token_totals[(model, token_type)] += count
+
+        for (endpoint, status), times in response_times.items():
+            count_requests, record_response_time = self._chat_metrics(
+                endpoint, status
+            )
+            count_requests(len(times))
+            for response_time_ms in times:
+                record_response_time(response_time_ms)
 
-        # Log business metrics
-        logger.info(
-            "Chat request completed",
-            endpoint=endpoint,
-            status=status,
-            response_time_ms=response_time_ms,
-            token_usage=token_usage,
-            user_id_hash=user_hash,
-        )
+        for (model, token_type), count in token_totals.items():
+            self.metrics.increment_counter(
+                "ai_tokens_used_total",
+                value=count,
+                tags={"model": model, "type": token_type},
+            )
+
+    def get_chat_request_recorder(
+        self, method: str, path: str, status: str
+    ) -> Callable[[float], None]:
+        """
+        Get a recorder for chat requests with a fixed endpoint and status.
+
+        The metric keys are built once, so callers that see the same
+        (method, path, status) combination repeatedly can cache the returned
+        function and skip per-request tag dict and string construction.
+
+        Args:
+            method: HTTP method
+            path: Route path template (keep cardinality bounded)
+            status: Request status (success, error, etc.)
+
+        Returns:
+            Function taking the response time in milliseconds
+        """
+        return self._chat_recorder(f"{method} {path}", status)
+
+    def _chat_recorder(self, endpoint: str, status: str) -> Callable[[float], None]:
+        """Get the cached chat request recorder for an endpoint and status."""
+        recorder = self._chat_recorders.get((endpoint, status))
+        if recorder is not None:
+            return recorder
+
+        count_request, record_response_time = self._chat_metrics(endpoint, status)
+
+        # No log here: record_chat_request and the monitoring middleware emit
+        # their own completion events
+        def record(response_time_ms: float):
+            count_request()
+            record_response_time(response_time_ms)
+
+        _bounded_put(self._chat_recorders, (endpoint, status), record)
+        return record
+
+    def _chat_metrics(
+        self, endpoint: str, status: str
+    ) -> Tuple[Callable[[int], None], Callable[[float], None]]:
+        """Get the request counter and response time recorder for a chat series."""
+        series = self._chat_series.get((endpoint, status))
+        if series is None:
+            series = (
+                self.metrics.counter_incrementer(
+                    "chat_requests_total", {"endpoint": endpoint, "status": status}
+                ),
+                self.metrics.histogram_recorder(
+                    "chat_response_time_ms", {"endpoint": endpoint}
+                ),
+            )
+            _bounded_put(self._chat_series, (endpoint, status), series)
+        return series
 
     def record_search_query(
         self,
@@ -252,19 +554,16 @@ class MonitoringService:
             "search_results_count", results_count, tags={"type": "knowledge_search"}
         )
 
-        # Hash user ID for privacy
-        user_hash = None
-        if user_id:
-            user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
-
         # Log search analytics
-        logger.info(
-            "Search query executed",
-            query_length=len(query),
-            results_count=results_count,
-            search_time_ms=search_time_ms,
-            user_id_hash=user_hash,
-        )
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Search query executed",
+                query_length=len(query),
+                results_count=results_count,
+                search_time_ms=search_time_ms,
+                # Hash user ID for privacy
+                user_id_hash=_hash_identifier(user_id) if user_id else None,
+            )
 
     def record_error(
         self,
@@ -280,10 +579,9 @@ class MonitoringService:
             "errors_total", tags={"error_type": error_type, "endpoint": endpoint}
         )
 
-        # Hash user ID for privacy
-        user_hash = None
-        if user_id:
-            user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:8]
+        # Hash user ID for privacy. Error callers often pass per-request IDs,
+        # which would only churn the user hash cache, so errors bypass it
+        user_hash = _hash_identifier_uncached(user_id) if user_id else None
 
         # Log error details
         logger.error(
@@ -309,12 +607,32 @@ class MonitoringService:
         # Record as gauge metric
         self.metrics.set_gauge(metric_name, value, tags)
 
-        logger.info(
-            "Business metric recorded",
-            metric_name=metric_name,
-            value=value,
-            tags=tags or {},
-        )
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Business metric recorded",
+                metric_name=metric_name,
+                value=value,
+                tags=tags or {},
+            )
+
+    def record_business_metrics_batch(
+        self, samples: List[Tuple[str, float, Optional[Dict[str, str]]]]
+    ):
+        """
+        Record several business metrics with a single call and log event.
+
+        Args:
+            samples: (metric_name, value, tags) tuples
+        """
+        set_gauge = self.metrics.set_gauge
+        for metric_name, value, tags in samples:
+            set_gauge(metric_name, value, tags)
+
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Business metrics recorded",
+                metrics={metric_name: value for metric_name, value, _ in samples},
+            )
 
     def record_user_session(self, session_id: str, action: str):
         """
@@ -324,11 +642,14 @@ class MonitoringService:
             session_id: Session identifier (will be hashed)
             action: Action taken (start, end, activity)
         """
-        session_hash = hashlib.sha256(session_id.encode()).hexdigest()[:8]
-
         self.metrics.increment_counter("user_sessions_total", tags={"action": action})
 
-        logger.info("User session event", session_hash=session_hash, action=action)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "User session event",
+                session_hash=_hash_identifier(session_id),
+                action=action,
+            )
 
     async def get_health_metrics(self) -> Dict[str, Any]:
         """
@@ -338,14 +659,13 @@ class MonitoringService:
             Dictionary containing current system health metrics
         """
         try:
-            current_time = datetime.utcnow()
-            uptime_seconds = (current_time - self.start_time).total_seconds()
+            self._apply_chat_events()
+            uptime_seconds = time.monotonic() - self.start_time
 
-            # Get metrics summary
-            metrics_summary = self.metrics.get_metrics_summary()
+            counters_count, gauges_count, histograms_count = self.metrics.get_sizes()
 
             return {
-                "timestamp": current_time.isoformat() + "Z",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
                 "monitoring_enabled": True,
                 "service_status": "healthy",
                 "uptime_seconds": uptime_seconds,
@@ -364,20 +684,12 @@ class MonitoringService:
                     "in_memory_metrics": True,
                 },
                 "metrics_summary": {
-                    "total_counters": len(metrics_summary["counters"]),
-                    "total_gauges": len(metrics_summary["gauges"]),
-                    "total_histograms": len(metrics_summary["histogram_summaries"]),
+                    "total_counters": counters_count,
+                    "total_gauges": gauges_count,
+                    "total_histograms": histograms_count,
                     "sample_metrics": {
-                        "chat_requests": sum(
-                            count
-                            for name, count in metrics_summary["counters"].items()
-                            if "chat_requests_total" in name
-                        ),
-                        "errors": sum(
-                            count
-                            for name, count in metrics_summary["counters"].items()
-                            if "errors_total" in name
-                        ),
+                        "chat_requests": self._family_total("chat_requests_total"),
+                        "errors": self._family_total("errors_total"),
                     },
                 },
             }
@@ -390,6 +702,14 @@ class MonitoringService:
                 "error": str(e),
             }
 
+    def _family_total(self, fragment: str) -> int:
+        """Sum the running totals of counter names containing a fragment."""
+        return sum(
+            total
+            for name, total in self.metrics.family_totals.items()
+            if fragment in name
+        )
+
     async def get_metrics_export(self) -> Dict[str, Any]:
         """
         Export all collected metrics for external monitoring systems.
@@ -398,16 +718,46 @@ class MonitoringService:
             Dictionary containing all metrics data
         """
         try:
+            self._apply_chat_events()
             return {
                 "timestamp": datetime.utcnow().isoformat() + "Z",
                 "service": "ai-career-mentor",
                 "version": "1.0.0",
-                "metrics": self.metrics.get_metrics_summary(),
+                "metrics": await self.metrics.get_metrics_summary_async(),
             }
         except Exception as e:
             logger.error("Failed to export metrics", error=str(e))
             return {"error": str(e)}
 
+    async def get_metrics_report(self) -> Dict[str, Any]:
+        """
+        Build the full metrics report served by /health/metrics.
+
+        The dashboard stream pushes the same document, so both consumers
+        share this builder.
+
+        Returns:
+            Dictionary with health, detailed metrics and collection status
+        """
+        health_metrics = await self.get_health_metrics()
+        metrics_export = await self.get_metrics_export()
+
+        return {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "service": "ai-career-mentor",
+            "version": self.settings.app_version,
+            "environment": "production",  # TODO: Add environment field to settings
+            "health": health_metrics,
+            "detailed_metrics": metrics_export.get("metrics", {}),
+            "collection_status": {
+                "enabled": True,
+                "application_insights": bool(
+                    self.settings.azure_application_insights_connection_string
+                ),
+                "in_memory_fallback": True,
+            },
+        }
+
     async def flush_metrics(self):
         """Flush pending metrics to external systems."""
         try:
@@ -415,13 +765,15 @@ class MonitoringService:
                 # In a real implementation, this would flush to Application Insights
                 logger.debug("Would flush metrics to Application Insights")
 
-            # Log current metrics summary
-            metrics_summary = self.metrics.get_metrics_summary()
+            self._apply_chat_events()
+
+            # Log current metric series counts
+            counters_count, gauges_count, histograms_count = self.metrics.get_sizes()
             logger.info(
                 "Metrics flushed",
-                counters_count=len(metrics_summary["counters"]),
-                gauges_count=len(metrics_summary["gauges"]),
-                histograms_count=len(metrics_summary["histogram_summaries"]),
+                counters_count=counters_count,
+                gauges_count=gauges_count,
+                histograms_count=histograms_count,
             )
 
         except Exception as e:
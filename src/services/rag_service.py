@@ -6,21 +6,195 @@ Retrieval-Augmented Generation (RAG) using Azure Cognitive Search.
 Demonstrates advanced AI engineering patterns for knowledge-enhanced responses.
 """
 
+import asyncio
 import logging
+import re
 import time
-from typing import List, Optional, AsyncGenerator, Dict, Any, cast
-
-from openai import AsyncAzureOpenAI
-from openai.types.chat import ChatCompletionMessageParam
+from collections import deque
+from statistics import fmean
+from datetime import datetime, timezone
+from itertools import islice
+from typing import (
+    List,
+    Optional,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Any,
+    Iterable,
+    MutableMapping,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
+from uuid import uuid4
+
+from openai import AsyncAzureOpenAI, AsyncStream
+from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
 from openai._exceptions import APIError, RateLimitError, APITimeoutError
 
 from src.config.settings import Settings
 from src.models.chat_models import ChatMessage, ChatRequest
 from src.models.rag_models import SearchQuery, SearchResult, RAGResponse
+from src.services.cache_service import ExpiringLRUDict, SemanticResponseCache
 from src.services.search_service import AzureCognitiveSearchService
 
 logger = logging.getLogger(__name__)
 
+# Queries mentioning any of these use knowledge retrieval
+_CAREER_KEYWORDS = (
+    "career",
+    "job",
+    "skill",
+    "interview",
+    "salary",
+    "learning",
+    "transition",
+    "ai engineer",
+    "machine learning",
+    "data science",
+    "resume",
+    "portfolio",
+    "experience",
+    "qualification",
+    "certification",
+    "bootcamp",
+    "degree",
+    "course",
+    "training",
+    "mentor",
+    "advice",
+)
+_CAREER_KEYWORD_PATTERN = re.compile("|".join(map(re.escape, _CAREER_KEYWORDS)))
+
+# Fixed system prompt for knowledge-enhanced responses. Retrieved sources and
+# conversation turns go in separate messages so this prefix stays identical.
+_RAG_SYSTEM_PROMPT = """You are an expert AI Career Mentor with access to comprehensive career guidance knowledge. 
+Your role is to provide personalized, actionable advice for professionals transitioning to or advancing in AI engineering roles.
+
+Guidelines:
+- Use the provided knowledge sources to enhance your responses
+- Always cite sources when using specific information
+- Provide practical, actionable advice
+- Be encouraging but realistic about career challenges
+- Tailor advice to the user's background and goals
+- If knowledge sources don't contain relevant information, rely on your general expertise
+
+Knowledge sources are provided as separate messages labelled [Source N]. Please provide a comprehensive response using the knowledge sources where relevant, and cite them appropriately."""
+
+
+def _recent_messages(
+    history: Sequence[ChatMessage], count: int
+) -> Iterable[ChatMessage]:
+    """Iterate over the last `count` messages of a history list or deque."""
+    return islice(history, max(0, len(history) - count), None)
+
+
+def _elapsed_ms(start_ns: int) -> int:
+    """Whole milliseconds elapsed since a time.perf_counter_ns() reading."""
+    return (time.perf_counter_ns() - start_ns) // 1_000_000
+
+
+def _confidence_score(sources: Sequence[SearchResult]) -> Optional[float]:
+    """Scale the mean retrieval similarity into a 0.7-0.95 confidence score."""
+    if not sources:
+        return None
+    avg_similarity = fmean(s.similarity_score for s in sources)
+    return min(0.95, 0.7 + avg_similarity * 0.25)
+
+
+async def _discard_stream(task: "asyncio.Task[AsyncStream[ChatCompletionChunk]]"):
+    """Cancel a pending completion stream, or close it if it already started."""
+    if not task.done():
+        task.cancel()
+    try:
+        stream = await task
+    except asyncio.CancelledError:
+        # Expected from the task cancelled above, but a cancellation aimed at
+        # the caller (such as a client disconnect) must still propagate
+        current = asyncio.current_task()
+        if not task.cancelled() or (current is not None and current.cancelling()):
+            raise
+        return
+    except Exception:
+        return
+    # Closing the response aborts generation so no further tokens are billed
+    await stream.response.aclose()
+
+
+class _EmbeddingBatcher:
+    """
+    Coalesces concurrent query embeddings into batched embedding requests.
+
+    Queries arriving within a short window (or until the batch is full) are
+    embedded with a single API call, and each caller gets its own vector back.
+    """
+
+    def __init__(
+        self,
+        embed_many: Callable[[List[str]], Awaitable[List[List[float]]]],
+        window_seconds: float = 0.005,
+        max_batch_size: int = 16,
+    ):
+        self._embed_many = embed_many
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, "asyncio.Future[List[float]]"]] = []
+        # Timer that flushes a partial batch once the window closes
+        self._window_timer: Optional[asyncio.TimerHandle] = None
+        # Keep references to in-flight flushes so they are not garbage collected
+        self._flushes: Set["asyncio.Task[None]"] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text as part of the current batch."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[List[float]]" = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._start_flush()
+        elif len(self._pending) == 1:
+            self._window_timer = loop.call_later(
+                self.window_seconds, self._start_flush
+            )
+
+        return await future
+
+    def _start_flush(self):
+        if self._window_timer is not None:
+            self._window_timer.cancel()
+            self._window_timer = None
+
+        task = asyncio.create_task(self._flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            embeddings = await self._embed_many([text for text, _ in batch])
+            if len(embeddings) != len(batch):
+                # Embeddings cannot be matched to texts reliably, and a caller
+                # left without one would wait forever
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, got {len(embeddings)}"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
 
 class RAGEnhancedAIService:
     """
@@ -30,6 +204,19 @@ class RAGEnhancedAIService:
     providing more accurate and contextual responses based on the knowledge base.
     """
 
+    # System messages for responses without retrieved knowledge, shared by
+    # every request (the OpenAI SDK does not mutate the messages it is given)
+    _DEFAULT_SYSTEM_MSG = {
+        "role": "system",
+        "content": """You are an expert AI Career Mentor specializing in helping professionals 
+                        transition to and advance in AI engineering roles. Provide practical, actionable advice 
+                        tailored to each person's background and goals.""",
+    }
+    _STREAM_SYSTEM_MSG = {
+        "role": "system",
+        "content": "You are an expert AI Career Mentor. Provide practical, actionable advice.",
+    }
+
     def __init__(self, settings: Settings):
         """Initialize the RAG-enhanced AI service."""
         self.settings = settings
@@ -45,7 +232,14 @@ class RAGEnhancedAIService:
         self.search_service = AzureCognitiveSearchService(settings)
 
         # Conversation history management
-        self.conversation_history: Dict[str, List[ChatMessage]] = {}
+        # (bounded deques, so appends evict the oldest messages without copying).
+        # Conversations idle past the TTL, or beyond the size cap, are dropped.
+        self.conversation_history: MutableMapping[
+            str, Deque[ChatMessage]
+        ] = ExpiringLRUDict(
+            max_size=settings.max_conversations,
+            ttl_seconds=settings.conversation_ttl_seconds,
+        )
         self.max_history_messages = 20
 
         # RAG configuration
@@ -60,6 +254,22 @@ class RAGEnhancedAIService:
             "transition",
         ]
 
+        # Semantic response cache (paraphrased queries reuse earlier answers).
+        # Only opening questions use it: answers to follow-ups depend on their
+        # conversation, so sharing them could leak another user's context.
+        self.semantic_cache = SemanticResponseCache(
+            max_size=256, ttl_seconds=1800, similarity_threshold=0.92
+        )
+
+        # The static system message is built once and shared by every request
+        self._static_system_msg = {
+            "role": "system",
+            "content": self._static_system_prompt(),
+        }
+
+        # Query embeddings from concurrent requests are batched into one call
+        self._embedding_batcher = _EmbeddingBatcher(self._embed_queries)
+
     async def initialize(self) -> bool:
         """
         Initialize the RAG service components.
@@ -95,43 +305,57 @@ class RAGEnhancedAIService:
         Returns:
             True if RAG should be used, False otherwise
         """
-        query_lower = query.lower()
+        # Single pass over the query for all career-related keywords
+        return _CAREER_KEYWORD_PATTERN.search(query.lower()) is not None
 
-        # Check for career-related keywords
-        career_keywords = [
-            "career",
-            "job",
-            "skill",
-            "interview",
-            "salary",
-            "learning",
-            "transition",
-            "ai engineer",
-            "machine learning",
-            "data science",
-            "resume",
-            "portfolio",
-            "experience",
-            "qualification",
-            "certification",
-            "bootcamp",
-            "degree",
-            "course",
-            "training",
-            "mentor",
-            "advice",
-        ]
+    def _static_system_prompt(self) -> str:
+        """
+        Get the fixed RAG system prompt.
+
+        It never varies between requests, so it forms a stable message prefix
+        that the model provider's prompt cache can reuse across turns.
+        """
+        return _RAG_SYSTEM_PROMPT
+
+    def _knowledge_messages(
+        self, retrieved_sources: List[SearchResult]
+    ) -> List[Dict[str, str]]:
+        """
+        Build one system message per retrieved knowledge source.
 
-        return any(keyword in query_lower for keyword in career_keywords)
+        Args:
+            retrieved_sources: Retrieved knowledge sources
 
-    def _build_rag_prompt(
+        Returns:
+            Messages carrying the source content, in relevance order
+        """
+        messages = []
+        for i, source in enumerate(retrieved_sources, 1):
+            # Collect the lines and join once rather than growing a string
+            lines = [
+                f"[Source {i}] {source.title}",
+                f"Type: {source.document_type.value}",
+                f"Summary: {source.summary}",
+                f"Content: {source.content_snippet}",
+            ]
+            if source.tags:
+                lines.append(f"Tags: {', '.join(source.tags)}")
+            lines.append(f"Relevance Score: {source.similarity_score:.2f}")
+            messages.append({"role": "system", "content": "\n".join(lines)})
+        return messages
+
+    def _build_rag_messages(
         self,
         original_query: str,
         retrieved_sources: List[SearchResult],
-        conversation_history: List[ChatMessage],
-    ) -> str:
+        conversation_history: Sequence[ChatMessage],
+    ) -> List[Dict[str, str]]:
         """
-        Build an enhanced prompt with retrieved knowledge.
+        Build the chat messages for a knowledge-enhanced completion.
+
+        The static system prompt comes first, followed by the retrieved
+        knowledge, recent conversation turns and the user's query, so the
+        per-request content never changes the cacheable prefix.
 
         Args:
             original_query: User's original query
@@ -139,44 +363,88 @@ class RAGEnhancedAIService:
             conversation_history: Recent conversation messages
 
         Returns:
-            Enhanced prompt with context
+            Messages for the chat completion request
         """
-        # Base system prompt
-        system_prompt = """You are an expert AI Career Mentor with access to comprehensive career guidance knowledge. 
-Your role is to provide personalized, actionable advice for professionals transitioning to or advancing in AI engineering roles.
+        messages = [self._static_system_msg]
+        messages.extend(self._knowledge_messages(retrieved_sources))
 
-Guidelines:
-- Use the provided knowledge sources to enhance your responses
-- Always cite sources when using specific information
-- Provide practical, actionable advice
-- Be encouraging but realistic about career challenges
-- Tailor advice to the user's background and goals
-- If knowledge sources don't contain relevant information, rely on your general expertise"""
-
-        # Add retrieved knowledge context
-        knowledge_context = ""
-        if retrieved_sources:
-            knowledge_context = "\n\nRELEVANT KNOWLEDGE SOURCES:\n"
-            for i, source in enumerate(retrieved_sources, 1):
-                knowledge_context += f"\n[Source {i}] {source.title}\n"
-                knowledge_context += f"Type: {source.document_type.value}\n"
-                knowledge_context += f"Summary: {source.summary}\n"
-                knowledge_context += f"Content: {source.content_snippet}\n"
-                if source.tags:
-                    knowledge_context += f"Tags: {', '.join(source.tags)}\n"
-                knowledge_context += f"Relevance Score: {source.similarity_score:.2f}\n"
-
-        # Add conversation context
-        context_prompt = ""
-        if conversation_history:
-            context_prompt = "\n\nCONVERSATION CONTEXT:\n"
-            for msg in conversation_history[-6:]:  # Last 6 messages for context
-                context_prompt += f"{msg.role.title()}: {msg.content}\n"
-
-        # Combine all parts
-        enhanced_prompt = f"{system_prompt}{knowledge_context}{context_prompt}\n\nUSER QUERY: {original_query}\n\nPlease provide a comprehensive response using the knowledge sources where relevant, and cite them appropriately."
-
-        return enhanced_prompt
+        # Last 6 messages for context
+        for msg in _recent_messages(conversation_history, 6):
+            messages.append({"role": msg.role, "content": msg.content})
+
+        messages.append({"role": "user", "content": original_query})
+        return messages
+
+    async def _get_conversation_history(
+        self, conversation_id: Optional[str]
+    ) -> Sequence[ChatMessage]:
+        """
+        Get the stored history for a conversation.
+
+        History is held in memory today; this is async so a persistent store
+        can be swapped in without restructuring the callers.
+        """
+        if not conversation_id:
+            return []
+        return self.conversation_history.get(conversation_id, [])
+
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        """
+        Embed a query for the semantic cache and vector search.
+
+        Concurrent calls are batched into a single embeddings request.
+
+        Returns:
+            The query embedding, or None if embedding failed
+        """
+        try:
+            return await self._embedding_batcher.embed(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed: {e}")
+            return None
+
+    async def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed a batch of queries with one embeddings request."""
+        return await self.search_service.generate_embeddings(queries)
+
+    def _append_to_history(
+        self, conversation_id: Optional[str], user_message: str, response: str
+    ):
+        """Add a user/assistant exchange to the conversation history."""
+        if not conversation_id:
+            return
+
+        history = self.conversation_history.get(conversation_id)
+        if history is None:
+            history = deque(maxlen=self.max_history_messages)
+            self.conversation_history[conversation_id] = history
+
+        history.append(ChatMessage(content=user_message, role="user"))
+        history.append(ChatMessage(content=response, role="assistant"))
+
+    def _cached_rag_response(
+        self, cached: RAGResponse, request: ChatRequest, start_ns: int
+    ) -> RAGResponse:
+        """Build the response for a semantic cache hit."""
+        self._append_to_history(
+            request.conversation_id, request.message, cached.message
+        )
+
+        total_time = _elapsed_ms(start_ns)
+        logger.info(f"Served RAG response from semantic cache in {total_time}ms")
+
+        # No retrieval, generation or tokens were spent on this request
+        return cached.model_copy(
+            update={
+                "id": str(uuid4()),
+                "timestamp": datetime.now(timezone.utc),
+                "conversation_id": request.conversation_id,
+                "processing_time_ms": total_time,
+                "retrieval_time_ms": None,
+                "generation_time_ms": 0,
+                "token_usage": None,
+            }
+        )
 
     async def generate_rag_response(self, request: ChatRequest) -> RAGResponse:
         """
@@ -188,32 +456,46 @@ Guidelines:
         Returns:
             RAG-enhanced response with sources and metadata
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         retrieval_time = 0
         generation_time = 0
         retrieved_sources = []
 
         try:
-            # Get conversation history
-            conversation_history = []
-            if request.conversation_id:
-                conversation_history = self.conversation_history.get(
-                    request.conversation_id, []
-                )
-
             # Determine if we should use RAG
             use_rag = self._should_use_rag(request.message)
 
+            # Get conversation history and the query embedding. Retrieval needs
+            # the embedding anyway, so for RAG queries both are fetched at once.
+            query_embedding = None
+            if use_rag:
+                conversation_history, query_embedding = await asyncio.gather(
+                    self._get_conversation_history(request.conversation_id),
+                    self._embed_query(request.message),
+                )
+            else:
+                conversation_history = await self._get_conversation_history(
+                    request.conversation_id
+                )
+
+            # Check the semantic cache before retrieval and generation. It is
+            # keyed by the retrieval embedding, so only RAG queries without
+            # conversation history use it (no extra embedding call is made).
+            use_cache = query_embedding is not None and not conversation_history
+            if use_cache:
+                cached = await self.semantic_cache.aget(query_embedding)
+                if cached is not None:
+                    return self._cached_rag_response(cached, request, start_ns)
+
             if use_rag:
                 # Perform knowledge retrieval
-                retrieval_start = time.time()
+                retrieval_start_ns = time.perf_counter_ns()
 
                 # Build search query with conversation context
                 context = ""
                 if conversation_history:
-                    recent_messages = conversation_history[
-                        -4:
-                    ]  # Last 4 messages for context
+                    # Last 4 messages for context
+                    recent_messages = _recent_messages(conversation_history, 4)
                     context = " ".join([msg.content for msg in recent_messages])
 
                 search_query = SearchQuery(
@@ -224,34 +506,27 @@ Guidelines:
                 )
 
                 retrieved_sources = await self.search_service.semantic_search(
-                    search_query
+                    search_query, query_vector=query_embedding
                 )
-                retrieval_time = int((time.time() - retrieval_start) * 1000)
+                retrieval_time = _elapsed_ms(retrieval_start_ns)
 
                 logger.info(f"Retrieved {len(retrieved_sources)} sources for query")
 
             # Generate response
-            generation_start = time.time()
+            generation_start_ns = time.perf_counter_ns()
 
             if retrieved_sources:
                 # Use RAG-enhanced prompt
-                enhanced_prompt = self._build_rag_prompt(
+                messages = self._build_rag_messages(
                     request.message, retrieved_sources, conversation_history
                 )
-                messages = [{"role": "system", "content": enhanced_prompt}]
             else:
                 # Use standard conversation flow
-                messages = [
-                    {
-                        "role": "system",
-                        "content": """You are an expert AI Career Mentor specializing in helping professionals 
-                        transition to and advance in AI engineering roles. Provide practical, actionable advice 
-                        tailored to each person's background and goals.""",
-                    }
-                ]
+                messages = [self._DEFAULT_SYSTEM_MSG]
 
                 # Add conversation history
-                for msg in conversation_history[-10:]:  # Last 10 messages
+                # Last 10 messages
+                for msg in _recent_messages(conversation_history, 10):
                     messages.append({"role": msg.role, "content": msg.content})
 
                 # Add current message
@@ -266,7 +541,7 @@ Guidelines:
                 stream=False,
             )
 
-            generation_time = int((time.time() - generation_start) * 1000)
+            generation_time = _elapsed_ms(generation_start_ns)
 
             # Extract response
             response_message = (
@@ -275,36 +550,15 @@ Guidelines:
             )
 
             # Calculate confidence score based on retrieval quality
-            confidence_score = None
-            if retrieved_sources:
-                avg_similarity = sum(
-                    s.similarity_score for s in retrieved_sources
-                ) / len(retrieved_sources)
-                confidence_score = min(
-                    0.95, 0.7 + (avg_similarity * 0.25)
-                )  # Scale to 0.7-0.95
+            confidence_score = _confidence_score(retrieved_sources)
 
             # Update conversation history
-            if request.conversation_id:
-                if request.conversation_id not in self.conversation_history:
-                    self.conversation_history[request.conversation_id] = []
-
-                history = self.conversation_history[request.conversation_id]
-
-                # Add user message
-                history.append(ChatMessage(content=request.message, role="user"))
-
-                # Add assistant response
-                history.append(ChatMessage(content=response_message, role="assistant"))
-
-                # Trim history if too long
-                if len(history) > self.max_history_messages:
-                    self.conversation_history[request.conversation_id] = history[
-                        -self.max_history_messages :
-                    ]
+            self._append_to_history(
+                request.conversation_id, request.message, response_message
+            )
 
             # Create RAG response
-            total_time = int((time.time() - start_time) * 1000)
+            total_time = _elapsed_ms(start_ns)
 
             rag_response = RAGResponse(
                 message=response_message,
@@ -331,6 +585,9 @@ Guidelines:
                 f"(retrieval: {retrieval_time}ms, generation: {generation_time}ms)"
             )
 
+            if use_cache:
+                self.semantic_cache.set(query_embedding, rag_response)
+
             return rag_response
 
         except APIError as e:
@@ -358,26 +615,29 @@ Guidelines:
         Yields:
             Dictionary chunks with response data and metadata
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         retrieval_time = 0
         retrieved_sources = []
+        # Completion opened while retrieval runs, until it is used or discarded
+        speculative_stream: Optional[
+            "asyncio.Task[AsyncStream[ChatCompletionChunk]]"
+        ] = None
 
         try:
+            # Get conversation history (used for retrieval and for the prompt)
+            conversation_history = await self._get_conversation_history(
+                request.conversation_id
+            )
+
             # Perform retrieval first (if applicable)
             use_rag = self._should_use_rag(request.message)
 
             if use_rag:
-                retrieval_start = time.time()
-
-                conversation_history = []
-                if request.conversation_id:
-                    conversation_history = self.conversation_history.get(
-                        request.conversation_id, []
-                    )
+                retrieval_start_ns = time.perf_counter_ns()
 
                 context = ""
                 if conversation_history:
-                    recent_messages = conversation_history[-4:]
+                    recent_messages = _recent_messages(conversation_history, 4)
                     context = " ".join([msg.content for msg in recent_messages])
 
                 search_query = SearchQuery(
@@ -387,10 +647,22 @@ Guidelines:
                     similarity_threshold=self.min_retrieval_score,
                 )
 
+                # Open the plain completion stream while retrieval runs; it is
+                # used as-is when nothing relevant is retrieved, and discarded
+                # before any content is read otherwise
+                speculative_stream = asyncio.create_task(
+                    self._create_stream(
+                        request,
+                        self._standard_stream_messages(request, conversation_history),
+                    )
+                )
+
+                # Batched with other concurrent requests' query embeddings
+                query_embedding = await self._embed_query(request.message)
                 retrieved_sources = await self.search_service.semantic_search(
-                    search_query
+                    search_query, query_vector=query_embedding
                 )
-                retrieval_time = int((time.time() - retrieval_start) * 1000)
+                retrieval_time = _elapsed_ms(retrieval_start_ns)
 
                 # Yield retrieval metadata
                 yield {
@@ -407,42 +679,31 @@ Guidelines:
                 }
 
             # Build messages for streaming
-            conversation_history = []
-            if request.conversation_id:
-                conversation_history = self.conversation_history.get(
-                    request.conversation_id, []
-                )
-
             if retrieved_sources:
-                enhanced_prompt = self._build_rag_prompt(
-                    request.message, retrieved_sources, conversation_history
+                if speculative_stream is not None:
+                    await _discard_stream(speculative_stream)
+                    speculative_stream = None
+                stream = await self._create_stream(
+                    request,
+                    self._build_rag_messages(
+                        request.message, retrieved_sources, conversation_history
+                    ),
                 )
-                messages = [{"role": "system", "content": enhanced_prompt}]
+            elif speculative_stream is not None:
+                task, speculative_stream = speculative_stream, None
+                stream = await task
             else:
-                messages = [
-                    {
-                        "role": "system",
-                        "content": "You are an expert AI Career Mentor. Provide practical, actionable advice.",
-                    }
-                ]
-
-                for msg in conversation_history[-10:]:
-                    messages.append({"role": msg.role, "content": msg.content})
-
-                messages.append({"role": "user", "content": request.message})
+                stream = await self._create_stream(
+                    request,
+                    self._standard_stream_messages(request, conversation_history),
+                )
 
             # Stream response
-            full_response = ""
-            async for chunk in await self.client.chat.completions.create(
-                model=self.settings.azure_openai_deployment_name,
-                messages=cast(List[ChatCompletionMessageParam], messages),
-                temperature=request.temperature or self.settings.default_temperature,
-                max_tokens=request.max_tokens or self.settings.max_tokens,
-                stream=True,
-            ):
+            response_chunks: List[str] = []
+            async for chunk in stream:
                 if chunk.choices and chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
-                    full_response += content
+                    response_chunks.append(content)
 
                     yield {
                         "type": "content_chunk",
@@ -451,21 +712,12 @@ Guidelines:
                     }
 
             # Final metadata
-            total_time = int((time.time() - start_time) * 1000)
+            total_time = _elapsed_ms(start_ns)
 
             # Update conversation history
-            if request.conversation_id:
-                if request.conversation_id not in self.conversation_history:
-                    self.conversation_history[request.conversation_id] = []
-
-                history = self.conversation_history[request.conversation_id]
-                history.append(ChatMessage(content=request.message, role="user"))
-                history.append(ChatMessage(content=full_response, role="assistant"))
-
-                if len(history) > self.max_history_messages:
-                    self.conversation_history[request.conversation_id] = history[
-                        -self.max_history_messages :
-                    ]
+            self._append_to_history(
+                request.conversation_id, request.message, "".join(response_chunks)
+            )
 
             yield {
                 "type": "response_complete",
@@ -478,6 +730,35 @@ Guidelines:
         except Exception as e:
             logger.error(f"Error in streaming RAG response: {e}")
             yield {"type": "error", "error": str(e)}
+        finally:
+            # The consumer went away (or retrieval failed) before the
+            # speculative stream was used or discarded
+            if speculative_stream is not None:
+                await _discard_stream(speculative_stream)
+
+    def _standard_stream_messages(
+        self, request: ChatRequest, conversation_history: Sequence[ChatMessage]
+    ) -> List[Dict[str, str]]:
+        """Build the messages for a streaming response without retrieved knowledge."""
+        messages = [self._STREAM_SYSTEM_MSG]
+
+        for msg in _recent_messages(conversation_history, 10):
+            messages.append({"role": msg.role, "content": msg.content})
+
+        messages.append({"role": "user", "content": request.message})
+        return messages
+
+    async def _create_stream(
+        self, request: ChatRequest, messages: List[Dict[str, str]]
+    ) -> "AsyncStream[ChatCompletionChunk]":
+        """Start a streaming chat completion."""
+        return await self.client.chat.completions.create(
+            model=self.settings.azure_openai_deployment_name,
+            messages=cast(List[ChatCompletionMessageParam], messages),
+            temperature=request.temperature or self.settings.default_temperature,
+            max_tokens=request.max_tokens or self.settings.max_tokens,
+            stream=True,
+        )
 
     def clear_conversation_history(self, conversation_id: str):
         """Clear conversation history for a specific conversation."""
@@ -8,11 +8,17 @@ Demonstrates enterprise-grade search integration for AI applications.
 
 import asyncio
 import logging
-from typing import List
+import math
+import re
+import time
+from contextlib import suppress
+from operator import itemgetter
+from typing import Any, Dict, Hashable, List, Optional
 from datetime import datetime, timezone
-import json
+from functools import lru_cache
 import hashlib
 
+import orjson
 from azure.search.documents.aio import SearchClient
 from azure.search.documents.models import VectorizedQuery
 from azure.search.documents.indexes.aio import SearchIndexClient
@@ -35,6 +41,7 @@ from azure.core.exceptions import AzureError
 from openai import AsyncAzureOpenAI
 
 from src.config.settings import Settings
+from src.services.cache_service import SemanticResponseCache
 from src.models.rag_models import (
     KnowledgeDocument,
     SearchQuery,
@@ -47,6 +54,84 @@ from src.models.rag_models import (
 logger = logging.getLogger(__name__)
 
 
+def _unit_vector(vector: List[float]) -> List[float]:
+    """Scale an embedding to unit length (so dot product equals cosine)."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return vector
+    return [x / norm for x in vector]
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_query(text: str) -> str:
+    """Lowercase a query, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE.sub(" ", text).strip().rstrip("?!.,;: ").lower()
+
+
+def _snippet(content: str, max_length: int = 500) -> str:
+    """Truncate content to `max_length` characters, marking the cut with "..."."""
+    if len(content) <= max_length:
+        return content
+    return f"{content[:max_length]}..."
+
+
+# Fields semantic_search reads from each hit
+_RESULT_FIELDS = [
+    "id",
+    "title",
+    "content",
+    "summary",
+    "document_type",
+    "tags",
+    "metadata",
+]
+
+
+@lru_cache(maxsize=1024)
+def _parse_metadata(raw: str) -> Dict[str, Any]:
+    """Parse stored metadata JSON (shared between callers, so do not mutate)."""
+    # Keyed by the raw string, so a re-indexed document never gets stale metadata
+    return orjson.loads(raw)
+
+
+class _TokenBucket:
+    """
+    Async token bucket limiting how often an operation may start.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so short
+    bursts run immediately and sustained load is held to the configured rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
 class AzureCognitiveSearchService:
     """
     Service for managing Azure Cognitive Search operations for RAG.
@@ -71,17 +156,35 @@ class AzureCognitiveSearchService:
             endpoint=settings.azure_search_endpoint, credential=self.credential
         )
 
-        # Initialize OpenAI client for embeddings
+        # Search configuration
+        self.vector_search_dimensions = 1536  # text-embedding-ada-002 dimensions
+        self.max_retries = 3
+        self.retry_delay = 1.0
+
+        # Initialize OpenAI client for embeddings. The SDK retries rate limits,
+        # connection errors and 5xx responses with jittered exponential backoff,
+        # waiting for the Retry-After header when the service sends one.
         self.openai_client = AsyncAzureOpenAI(
             api_key=settings.azure_openai_key,
             api_version=settings.azure_openai_api_version,
             azure_endpoint=settings.azure_openai_endpoint,
+            max_retries=self.max_retries,
         )
 
-        # Search configuration
-        self.vector_search_dimensions = 1536  # text-embedding-ada-002 dimensions
-        self.max_retries = 3
-        self.retry_delay = 1.0
+        # Recent search results keyed by query embedding and filters. Near-duplicate
+        # queries skip the search request; index changes clear it. Kept small:
+        # each miss scans every entry (in a worker thread, via aget).
+        self.search_cache = SemanticResponseCache(
+            max_size=256, ttl_seconds=300, similarity_threshold=0.95
+        )
+
+        # Paces document uploads to the search service's request budget
+        self._upload_limiter = _TokenBucket(settings.search_upload_rate)
+
+        # Bounds concurrent embedding requests to stay within the OpenAI rate limit
+        self._embedding_semaphore = asyncio.Semaphore(
+            settings.embedding_max_concurrency
+        )
 
     async def initialize_index(self) -> bool:
         """
@@ -136,6 +239,13 @@ class AzureCognitiveSearchService:
                 SimpleField(
                     name="metadata", type=SearchFieldDataType.String, retrievable=True
                 ),
+                SimpleField(
+                    name="content_length",
+                    type=SearchFieldDataType.Int32,
+                    filterable=True,
+                    facetable=True,
+                    sortable=True,
+                ),
                 SimpleField(
                     name="source_url", type=SearchFieldDataType.String, retrievable=True
                 ),
@@ -172,10 +282,12 @@ class AzureCognitiveSearchService:
                     HnswAlgorithmConfiguration(
                         name="my-hnsw-config",
                         parameters={
-                            "m": 4,
-                            "efConstruction": 400,
-                            "efSearch": 500,
-                            "metric": "cosine",
+                            "m": self.settings.hnsw_m,
+                            "efConstruction": self.settings.hnsw_ef_construction,
+                            "efSearch": self.settings.hnsw_ef_search,
+                            # Embeddings are stored and queried at unit length,
+                            # so dot product ranks like cosine without the norms
+                            "metric": "dotProduct",
                         },
                     )
                 ],
@@ -226,6 +338,9 @@ class AzureCognitiveSearchService:
         """
         Generate embedding vector for text using Azure OpenAI.
 
+        Vectors are normalized to unit length, both for indexing and for
+        queries, to match the index's dot product metric.
+
         Args:
             text: Text to generate embedding for
 
@@ -236,11 +351,64 @@ class AzureCognitiveSearchService:
             response = await self.openai_client.embeddings.create(
                 input=text, model="text-embedding-ada-002"
             )
-            return response.data[0].embedding
+            return _unit_vector(response.data[0].embedding)
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
 
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for several texts in one Azure OpenAI request.
+
+        Args:
+            texts: Texts to generate embeddings for
+
+        Returns:
+            Unit-length embeddings in the same order as the input texts
+        """
+        try:
+            response = await self.openai_client.embeddings.create(
+                input=texts, model="text-embedding-ada-002"
+            )
+            return [
+                _unit_vector(item.embedding)
+                for item in sorted(response.data, key=lambda item: item.index)
+            ]
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+            raise
+
+    @staticmethod
+    def _content_text(document: KnowledgeDocument) -> str:
+        """Text embedded for a document's content vector."""
+        return f"{document.title} {document.summary} {document.content}"
+
+    async def _embed_document(self, document: KnowledgeDocument) -> List[float]:
+        """Generate a document's content embedding, within the concurrency limit."""
+        async with self._embedding_semaphore:
+            return await self.generate_embedding(self._content_text(document))
+
+    @staticmethod
+    def _search_document(
+        document: KnowledgeDocument, content_vector: List[float]
+    ) -> Dict[str, Any]:
+        """Build the index representation of a knowledge document."""
+        return {
+            "id": document.id,
+            "title": document.title,
+            "content": document.content,
+            "summary": document.summary,
+            "document_type": document.document_type.value,
+            "tags": document.tags,
+            "metadata": orjson.dumps(document.metadata).decode(),
+            "content_length": len(document.content),
+            "source_url": document.source_url,
+            "author": document.author,
+            "created_at": document.created_at.isoformat(),
+            "updated_at": document.updated_at.isoformat(),
+            "content_vector": content_vector,
+        }
+
     async def index_document(self, document: KnowledgeDocument) -> bool:
         """
         Index a single document in Azure Cognitive Search.
@@ -253,30 +421,18 @@ class AzureCognitiveSearchService:
         """
         try:
             # Generate embedding for the document content
-            content_text = f"{document.title} {document.summary} {document.content}"
-            content_vector = await self.generate_embedding(content_text)
+            content_vector = await self._embed_document(document)
 
             # Prepare document for indexing
-            search_document = {
-                "id": document.id,
-                "title": document.title,
-                "content": document.content,
-                "summary": document.summary,
-                "document_type": document.document_type.value,
-                "tags": document.tags,
-                "metadata": json.dumps(document.metadata),
-                "source_url": document.source_url,
-                "author": document.author,
-                "created_at": document.created_at.isoformat(),
-                "updated_at": document.updated_at.isoformat(),
-                "content_vector": content_vector,
-            }
+            search_document = self._search_document(document, content_vector)
 
             # Upload document to search index
-            result = await self.search_client.upload_documents([search_document])
+            async with self._upload_limiter:
+                result = await self.search_client.upload_documents([search_document])
 
             if result[0].succeeded:
-                logger.info(f"Successfully indexed document: {document.id}")
+                logger.info("Successfully indexed document: %s", document.id)
+                self.search_cache.clear()
                 return True
             else:
                 logger.error(
@@ -300,8 +456,8 @@ class AzureCognitiveSearchService:
         Returns:
             IndexingStatus with operation results
         """
-        operation_id = hashlib.md5(
-            f"{datetime.now().isoformat()}_{len(documents)}".encode()
+        operation_id = hashlib.blake2b(
+            f"{datetime.now().isoformat()}_{len(documents)}".encode(), digest_size=8
         ).hexdigest()
 
         status = IndexingStatus(
@@ -315,50 +471,74 @@ class AzureCognitiveSearchService:
         )
 
         try:
-            # Process documents in smaller batches to avoid timeouts
-            batch_size = 10
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i : i + batch_size]
-                batch_documents = []
+            # Process documents in smaller batches to avoid timeouts; each batch
+            # is embedded in a single request (older Azure API versions accept
+            # at most 16 inputs per embeddings call)
+            batch_size = 16
+
+            # Embedding (OpenAI) and uploading (Search) are pipelined, so the
+            # next batch is embedded while the previous one uploads. The small
+            # queue keeps embedding from running far ahead of uploads.
+            upload_queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]" = (
+                asyncio.Queue(maxsize=2)
+            )
 
-                for document in batch:
-                    try:
-                        # Generate embedding
-                        content_text = (
-                            f"{document.title} {document.summary} {document.content}"
-                        )
-                        content_vector = await self.generate_embedding(content_text)
-
-                        # Prepare document
-                        search_document = {
-                            "id": document.id,
-                            "title": document.title,
-                            "content": document.content,
-                            "summary": document.summary,
-                            "document_type": document.document_type.value,
-                            "tags": document.tags,
-                            "metadata": json.dumps(document.metadata),
-                            "source_url": document.source_url,
-                            "author": document.author,
-                            "created_at": document.created_at.isoformat(),
-                            "updated_at": document.updated_at.isoformat(),
-                            "content_vector": content_vector,
-                        }
-                        batch_documents.append(search_document)
+            async def embed_batches():
+                try:
+                    for i in range(0, len(documents), batch_size):
+                        batch = documents[i : i + batch_size]
 
-                    except Exception as e:
-                        status.documents_failed += 1
-                        status.error_messages.append(
-                            f"Document {document.id}: {str(e)}"
+                        try:
+                            async with self._embedding_semaphore:
+                                content_vectors = await self.generate_embeddings(
+                                    [self._content_text(document) for document in batch]
+                                )
+                            if len(content_vectors) != len(batch):
+                                # Vectors cannot be matched to documents reliably
+                                raise ValueError(
+                                    f"expected {len(batch)} embeddings, "
+                                    f"got {len(content_vectors)}"
+                                )
+                        except Exception as e:
+                            status.documents_failed += len(batch)
+                            status.documents_processed += len(batch)
+                            status.error_messages.append(
+                                f"Batch embedding error: {str(e)}"
+                            )
+                            continue
+
+                        await upload_queue.put(
+                            [
+                                self._search_document(document, content_vector)
+                                for document, content_vector in zip(
+                                    batch, content_vectors
+                                )
+                            ]
                         )
-                        continue
+                except asyncio.CancelledError:
+                    # Only cancelled once the uploader has stopped, so the queue
+                    # may be full; the end marker must not block
+                    with suppress(asyncio.QueueFull):
+                        upload_queue.put_nowait(None)
+                    raise
+                except Exception:
+                    await upload_queue.put(None)
+                    raise
+
+                # Tell the uploader there are no more batches
+                await upload_queue.put(None)
+
+            async def upload_batches():
+                while True:
+                    batch_documents = await upload_queue.get()
+                    if batch_documents is None:
+                        return
 
-                # Upload batch
-                if batch_documents:
                     try:
-                        results = await self.search_client.upload_documents(
-                            batch_documents
-                        )
+                        async with self._upload_limiter:
+                            results = await self.search_client.upload_documents(
+                                batch_documents
+                            )
                         for result in results:
                             if result.succeeded:
                                 status.documents_successful += 1
@@ -371,10 +551,18 @@ class AzureCognitiveSearchService:
                         status.documents_failed += len(batch_documents)
                         status.error_messages.append(f"Batch upload error: {str(e)}")
 
-                status.documents_processed += len(batch)
+                    status.documents_processed += len(batch_documents)
 
-                # Small delay between batches
-                await asyncio.sleep(0.1)
+            embedding = asyncio.create_task(embed_batches())
+            try:
+                await upload_batches()
+                await embedding
+            finally:
+                if not embedding.done():
+                    # Stops embedding if uploading failed unexpectedly (or this
+                    # operation was cancelled), then waits for it to unwind
+                    embedding.cancel()
+                    await asyncio.wait({embedding})
 
             status.status = "completed"
             status.end_time = datetime.now(timezone.utc)
@@ -384,6 +572,9 @@ class AzureCognitiveSearchService:
             status.end_time = datetime.now(timezone.utc)
             status.error_messages.append(f"Operation failed: {str(e)}")
 
+        if status.documents_successful:
+            self.search_cache.clear()
+
         logger.info(
             f"Indexing operation {operation_id} completed: "
             f"{status.documents_successful} successful, {status.documents_failed} failed"
@@ -391,24 +582,41 @@ class AzureCognitiveSearchService:
 
         return status
 
-    async def semantic_search(self, query: SearchQuery) -> List[SearchResult]:
+    async def semantic_search(
+        self, query: SearchQuery, query_vector: Optional[List[float]] = None
+    ) -> List[SearchResult]:
         """
         Perform semantic search using Azure Cognitive Search.
 
         Args:
             query: Search query with parameters
+            query_vector: Precomputed embedding of query.query, if the caller
+                already has one
 
         Returns:
             List of search results with relevance scores
         """
         try:
             # Generate query embedding for vector search
-            query_vector = await self.generate_embedding(query.query)
+            if query_vector is None:
+                # Trivial variations of a query embed identically, so they
+                # share search cache entries
+                query_vector = await self.generate_embedding(
+                    _normalize_query(query.query) or query.query
+                )
+
+            scope = self._search_scope(query)
+            cached_results = await self.search_cache.aget(query_vector, scope)
+            if cached_results is not None:
+                logger.debug("Search cache hit for query: %.50s...", query.query)
+                return list(cached_results)
 
             # Build search parameters
             search_params = {
                 "search_text": query.query,
                 "top": query.max_results,
+                # Only the fields results are built from (not the stored vectors)
+                "select": _RESULT_FIELDS,
                 "query_type": "semantic",
                 "semantic_configuration_name": "my-semantic-config",
                 "query_caption": "extractive",
@@ -416,10 +624,13 @@ class AzureCognitiveSearchService:
             }
 
             # Add vector search
+            # The HNSW efSearch setting is fixed per index, so queries that need
+            # exact recall bypass the graph instead
             vector_query = VectorizedQuery(
                 vector=query_vector,
                 k_nearest_neighbors=query.max_results,
                 fields="content_vector",
+                exhaustive=query.exhaustive,
             )
             search_params["vector_queries"] = [vector_query]
 
@@ -444,45 +655,41 @@ class AzureCognitiveSearchService:
             # Perform search
             results = await self.search_client.search(**search_params)
 
-            # Process results
-            search_results = []
+            # Score results, keeping those above the threshold. Results are
+            # plain dicts, with Azure's scores under "@search.*" keys.
+            scored_results = []
             async for result in results:
-                # Calculate similarity score (hybrid of semantic and vector scores)
-                semantic_score = getattr(result, "@search.reranker_score", 0.0) or 0.0
-                vector_score = getattr(result, "@search.score", 0.0) or 0.0
-                similarity_score = max(
-                    semantic_score / 4.0, vector_score
-                )  # Normalize semantic score
+                similarity_score = self._similarity_score(result)
+                if similarity_score >= query.similarity_threshold:
+                    scored_results.append((similarity_score, result))
 
-                # Skip results below threshold
-                if similarity_score < query.similarity_threshold:
-                    continue
+            # Highest similarity first (stable, so ties keep Azure's ranking)
+            scored_results.sort(key=itemgetter(0), reverse=True)
 
+            # Build results for the survivors only
+            search_results = []
+            for similarity_score, result in scored_results:
                 # Extract highlighted snippets
-                captions = getattr(result, "@search.captions", [])
-                highlighted_snippets = []
-                if captions:
-                    for caption in captions:
-                        if hasattr(caption, "text"):
-                            highlighted_snippets.append(caption.text)
+                captions = result.get("@search.captions") or []
+                highlighted_snippets = [
+                    caption.text for caption in captions if hasattr(caption, "text")
+                ]
 
                 # Parse metadata
                 metadata = {}
                 if result.get("metadata"):
                     try:
-                        metadata = json.loads(result["metadata"])
-                    except (json.JSONDecodeError, TypeError):
+                        metadata = _parse_metadata(result["metadata"])
+                    except (orjson.JSONDecodeError, TypeError):
                         pass
 
                 search_result = SearchResult(
                     document_id=result["id"],
                     title=result["title"],
-                    content_snippet=result["content"][:500] + "..."
-                    if len(result["content"]) > 500
-                    else result["content"],
+                    content_snippet=_snippet(result["content"]),
                     summary=result["summary"],
                     document_type=DocumentType(result["document_type"]),
-                    similarity_score=min(similarity_score, 1.0),  # Cap at 1.0
+                    similarity_score=similarity_score,
                     tags=result.get("tags", []),
                     metadata=metadata,
                     highlighted_snippets=highlighted_snippets,
@@ -490,18 +697,39 @@ class AzureCognitiveSearchService:
 
                 search_results.append(search_result)
 
-            # Sort by similarity score
-            search_results.sort(key=lambda x: x.similarity_score, reverse=True)
-
+            # Per-query log: %-style so nothing is formatted when INFO is off
             logger.info(
-                f"Semantic search returned {len(search_results)} results for query: {query.query[:50]}..."
+                "Semantic search returned %d results for query: %.50s...",
+                len(search_results),
+                query.query,
             )
+            self.search_cache.set(query_vector, tuple(search_results), scope)
             return search_results
 
         except Exception as e:
             logger.error(f"Error performing semantic search: {e}")
             return []
 
+    @staticmethod
+    def _similarity_score(result: Dict[str, Any]) -> float:
+        """Combine a result's semantic and vector scores into a 0-1 similarity."""
+        semantic_score = result.get("@search.reranker_score") or 0.0
+        vector_score = result.get("@search.score") or 0.0
+        # Reranker scores range 0-4, so normalize before comparing
+        return min(max(semantic_score / 4.0, vector_score), 1.0)
+
+    @staticmethod
+    def _search_scope(query: SearchQuery) -> Hashable:
+        """Cache scope for a query: the options that change its results."""
+        # Filters are OR-ed together, so their order does not matter
+        return (
+            frozenset(query.document_types or ()),
+            frozenset(query.tags or ()),
+            query.max_results,
+            query.similarity_threshold,
+            query.exhaustive,
+        )
+
     async def get_knowledge_base_stats(self) -> KnowledgeBaseStats:
         """
         Get statistics about the knowledge base.
@@ -510,34 +738,35 @@ class AzureCognitiveSearchService:
             Knowledge base statistics and metrics
         """
         try:
-            # Get total document count
-            count_results = await self.search_client.search(
-                search_text="*", include_total_count=True, top=0
-            )
-            total_documents = count_results.get_count()
-
-            # Get documents by type
-            facet_results = await self.search_client.search(
-                search_text="*", facets=["document_type"], top=0
+            # Total document count, documents by type and a content sample for
+            # the average length are independent, so query them concurrently
+            count_results, facet_results, sample_results = await asyncio.gather(
+                self.search_client.search(
+                    search_text="*", include_total_count=True, top=0
+                ),
+                self.search_client.search(
+                    search_text="*", facets=["document_type"], top=0
+                ),
+                self.search_client.search(
+                    search_text="*", top=100, select=["content_length"]
+                ),
             )
+            total_documents = await count_results.get_count()
 
             documents_by_type = {}
-            facets = facet_results.get_facets()
+            facets = await facet_results.get_facets()
             if facets and "document_type" in facets:
                 for facet in facets["document_type"]:
                     doc_type = DocumentType(facet["value"])
                     documents_by_type[doc_type] = facet["count"]
 
             # Calculate average document length (approximate)
-            sample_results = await self.search_client.search(
-                search_text="*", top=100, select=["content"]
-            )
-
             total_length = 0
             sample_count = 0
             async for result in sample_results:
-                if result.get("content"):
-                    total_length += len(result["content"])
+                # Documents indexed before content_length was added have no value
+                if result.get("content_length") is not None:
+                    total_length += result["content_length"]
                     sample_count += 1
 
             average_length = total_length / sample_count if sample_count > 0 else 0
@@ -576,6 +805,7 @@ class AzureCognitiveSearchService:
             result = await self.search_client.delete_documents([{"id": document_id}])
             if result[0].succeeded:
                 logger.info(f"Successfully deleted document: {document_id}")
+                self.search_cache.clear()
                 return True
             else:
                 logger.error(
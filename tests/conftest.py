@@ -11,34 +11,24 @@ This module provides comprehensive testing infrastructure including:
 The fixtures are designed to be reusable across unit and integration tests.
 """
 
-import pytest
-import asyncio
-from unittest.mock import AsyncMock, MagicMock
+import copy
 import time
-from requests.exceptions import HTTPError
-
-from src.config.settings import Settings
-from src.models.chat_models import ChatMessage, ChatResponse
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
 import pytest_asyncio
-import httpx
-
-from src.services.ai_service import AzureOpenAIService
+from requests.exceptions import HTTPError
 
+from src.config.settings import Settings
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+# Heavier modules are imported inside the fixtures that use them, so test
+# files that don't need them are collected without importing them
+if TYPE_CHECKING:
+    from src.models.chat_models import ChatMessage, ChatResponse
 
 
-@pytest.fixture
-def test_settings() -> Settings:
+def _build_test_settings() -> Settings:
     """Create test settings with mock values."""
     return Settings(
         # Required settings with test values
@@ -57,15 +47,31 @@ def test_settings() -> Settings:
     )
 
 
+@pytest.fixture(scope="session")
+def test_settings() -> Settings:
+    """Test settings shared by the session (treat as read-only)."""
+    return _build_test_settings()
+
+
 @pytest.fixture
-def sample_chat_message() -> ChatMessage:
+def isolated_test_settings() -> Settings:
+    """Fresh test settings for tests that modify them."""
+    return _build_test_settings()
+
+
+@pytest.fixture
+def sample_chat_message() -> "ChatMessage":
     """Create a sample chat message for testing."""
+    from src.models.chat_models import ChatMessage
+
     return ChatMessage(content="How do I transition to AI engineering?", role="user")
 
 
 @pytest.fixture
-def sample_chat_response() -> ChatResponse:
+def sample_chat_response() -> "ChatResponse":
     """Create a sample chat response for testing."""
+    from src.models.chat_models import ChatResponse
+
     return ChatResponse(
         message="To transition to AI engineering, I recommend starting with...",
         conversation_id="test-conv-123",
@@ -96,9 +102,11 @@ def mock_chat_completion():
     return mock_response
 
 
-@pytest.fixture
-def mock_openai_client():
-    """Create a mock Azure OpenAI client."""
+# Building mock trees is slow compared with copying them, so the mocks below
+# are built once per session and deep-copied for each test.
+@pytest.fixture(scope="session")
+def _mock_openai_client_template():
+    """Build the mock Azure OpenAI client once."""
     mock_client = AsyncMock()
 
     # Mock chat completion response
@@ -116,18 +124,37 @@ def mock_openai_client():
 
 
 @pytest.fixture
-async def ai_service_with_mock_client(test_settings, mock_openai_client):
-    """Create an AI service with mocked OpenAI client."""
+def mock_openai_client(_mock_openai_client_template):
+    """Create a mock Azure OpenAI client."""
+    return copy.deepcopy(_mock_openai_client_template)
+
+
+@pytest.fixture(scope="session")
+def ai_service_with_mock_client(test_settings, _mock_openai_client_template):
+    """AI service with a mocked OpenAI client, shared by the session.
+
+    Its mock client and conversation state persist between tests; tests that
+    assert on calls should build a service around `mock_openai_client`.
+    """
+    from src.services.ai_service import AzureOpenAIService
+
     service = AzureOpenAIService(test_settings)
-    service.client = mock_openai_client
+    service.client = copy.deepcopy(_mock_openai_client_template)
     return service
 
 
+@pytest.fixture(scope="session")
+def _mock_http_client_template():
+    """Build the mock HTTP client once."""
+    import httpx
+
+    return AsyncMock(spec=httpx.AsyncClient)
+
+
 @pytest.fixture
-def mock_http_client():
+def mock_http_client(_mock_http_client_template):
     """Create a mock HTTP client for testing API endpoints."""
-    mock_client = AsyncMock(spec=httpx.AsyncClient)
-    return mock_client
+    return copy.deepcopy(_mock_http_client_template)
 
 
 @pytest.fixture
@@ -177,8 +204,10 @@ class TestDataFactory:
     @staticmethod
     def create_chat_message(
         content: str = "Test message", role: str = "user", **kwargs
-    ) -> ChatMessage:
+    ) -> "ChatMessage":
         """Create a test chat message."""
+        from src.models.chat_models import ChatMessage
+
         defaults = {"content": content, "role": role}
         defaults.update(kwargs)
         return ChatMessage(**defaults)
@@ -186,8 +215,10 @@ class TestDataFactory:
     @staticmethod
     def create_chat_response(
         message: str = "Test response", conversation_id: str = "test-conv", **kwargs
-    ) -> ChatResponse:
+    ) -> "ChatResponse":
         """Create a test chat response."""
+        from src.models.chat_models import ChatResponse
+
         defaults = {
             "message": message,
             "conversation_id": conversation_id,
@@ -206,16 +237,38 @@ def test_data_factory():
     return TestDataFactory
 
 
-# Async test utilities
-@pytest_asyncio.fixture
-async def async_test_client():
-    """Create an async test client for FastAPI testing."""
+# API test clients
+@pytest.fixture(scope="session")
+def client():
+    """Create one FastAPI test client shared by the whole test session."""
     from fastapi.testclient import TestClient
     from src.main import app
 
+    # Tests only issue requests, so one client (and app) can serve them all
+    return TestClient(app)
+
+
+@pytest.fixture
+def async_test_client(client):
+    """Provide the shared test client for FastAPI testing."""
     # Note: In a real implementation, you might use httpx.AsyncClient
     # for true async testing, but TestClient works for most cases
-    return TestClient(app)
+    return client
+
+
+@pytest.fixture
+def override_ai_service(client):
+    """Swap the chat endpoints' AI service dependency for an AsyncMock."""
+    from src.api.endpoints.chat import get_ai_service, get_rag_service
+
+    app = client.app
+    mock_service = AsyncMock()
+    app.dependency_overrides[get_ai_service] = lambda: mock_service
+    # The chat endpoint also resolves the RAG service; keep it off Azure too
+    app.dependency_overrides[get_rag_service] = lambda: AsyncMock()
+    yield mock_service
+    app.dependency_overrides.pop(get_ai_service, None)
+    app.dependency_overrides.pop(get_rag_service, None)
 
 
 # Performance testing utilities
@@ -244,15 +297,21 @@ def performance_timer():
 
 
 # Database mocking (for future use)
-@pytest.fixture
-def mock_database():
-    """Mock database connection for testing."""
+@pytest.fixture(scope="session")
+def _mock_database_template():
+    """Build the mock database connection once."""
     mock_db = MagicMock()
     mock_db.get_conversation.return_value = None
     mock_db.save_conversation.return_value = True
     return mock_db
 
 
+@pytest.fixture
+def mock_database(_mock_database_template):
+    """Mock database connection for testing."""
+    return copy.deepcopy(_mock_database_template)
+
+
 # Error simulation fixtures
 @pytest.fixture
 def simulate_network_error():
@@ -271,26 +330,34 @@ def simulate_network_error():
     return _simulate_error
 
 
+# Streaming chunk stand-ins, defined once rather than per test
+class MockDelta:
+    """Delta of a mock streaming chunk."""
+
+    def __init__(self, data):
+        self.content = data.get("content")
+
+
+class MockChoice:
+    """Choice of a mock streaming chunk."""
+
+    def __init__(self, choice_data):
+        self.delta = MockDelta(choice_data.get("delta", {}))
+        self.finish_reason = choice_data.get("finish_reason")
+
+
+class MockStreamChunk:
+    """Mock OpenAI streaming chunk."""
+
+    def __init__(self, chunk_data):
+        self.id = chunk_data.get("id", "")
+        self.choices = [MockChoice(choice) for choice in chunk_data.get("choices", [])]
+
+
 @pytest.fixture
 def mock_streaming_response():
     """Mock streaming response from OpenAI."""
 
-    class MockDelta:
-        def __init__(self, data):
-            self.content = data.get("content")
-            
-    class MockChoice:
-        def __init__(self, choice_data):
-            self.delta = MockDelta(choice_data.get("delta", {}))
-            self.finish_reason = choice_data.get("finish_reason")
-    
-    class MockStreamChunk:
-        def __init__(self, chunk_data):
-            self.id = chunk_data.get("id", "")
-            self.choices = [
-                MockChoice(choice) for choice in chunk_data.get("choices", [])
-            ]
-
     async def stream_generator():
         chunks = [
             {"id": "chunk_1", "choices": [{"delta": {"content": "Hello"}}]},
@@ -308,6 +375,14 @@ def mock_streaming_response():
 pytest_plugins = []
 
 
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop its fixtures use."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
 def pytest_configure(config):
     """Configure pytest with custom markers."""
     config.addinivalue_line(
@@ -7,21 +7,14 @@ and integration with services. They show professional API testing practices.
 """
 
 import pytest
-from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
 
-from src.main import app
 from src.models.chat_models import ChatResponse, HealthCheckResponse
 
 
 class TestHealthEndpoint:
     """Test the health check endpoint."""
 
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-
     async def test_health_check_success(self, client):
         """Test basic health check endpoint."""
         response = client.get("/api/v1/health")
@@ -59,11 +52,6 @@ class TestHealthEndpoint:
 class TestChatEndpoint:
     """Test the chat endpoint."""
 
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-
     @pytest.fixture
     def valid_chat_request(self):
         """Create a valid chat request payload."""
@@ -88,13 +76,14 @@ class TestChatEndpoint:
             },
         )
 
-    @patch("src.api.endpoints.chat._ai_service")
     async def test_chat_endpoint_success(
-        self, mock_service, client, valid_chat_request, mock_chat_response
+        self, override_ai_service, client, valid_chat_request, mock_chat_response
     ):
         """Test successful chat endpoint call."""
         # Mock the AI service response
-        mock_service.generate_response = AsyncMock(return_value=mock_chat_response)
+        override_ai_service.generate_response = AsyncMock(
+            return_value=mock_chat_response
+        )
 
         response = client.post("/api/v1/chat/chat", json=valid_chat_request)
 
@@ -185,13 +174,12 @@ class TestChatEndpoint:
 
         assert response.status_code == 422
 
-    @patch("src.api.endpoints.chat._ai_service")
     async def test_chat_endpoint_service_error(
-        self, mock_service, client, valid_chat_request
+        self, override_ai_service, client, valid_chat_request
     ):
         """Test chat endpoint when AI service raises an error."""
         # Mock the AI service to raise an error
-        mock_service.generate_response = AsyncMock(
+        override_ai_service.generate_response = AsyncMock(
             side_effect=Exception("AI service error")
         )
 
@@ -220,12 +208,13 @@ class TestChatEndpoint:
         # Should pass validation (422 would indicate validation failure)
         assert response.status_code != 422
 
-    @patch("src.api.endpoints.chat._ai_service")
     async def test_chat_endpoint_with_conversation_history(
-        self, mock_service, client, mock_chat_response
+        self, override_ai_service, client, mock_chat_response
     ):
         """Test chat endpoint with existing conversation."""
-        mock_service.generate_response = AsyncMock(return_value=mock_chat_response)
+        override_ai_service.generate_response = AsyncMock(
+            return_value=mock_chat_response
+        )
 
         request = {
             "message": "Follow-up question",
@@ -238,18 +227,13 @@ class TestChatEndpoint:
         assert response.status_code == 200
 
         # Verify service was called with the conversation_id
-        call_args = mock_service.generate_response.call_args[0][0]
+        call_args = override_ai_service.generate_response.call_args[0][0]
         assert call_args.conversation_id == "existing_conv"
 
 
 class TestChatStreamingEndpoint:
     """Test the streaming chat endpoint."""
 
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-
     @pytest.fixture
     def streaming_request(self):
         """Create a streaming chat request."""
@@ -259,13 +243,12 @@ class TestChatStreamingEndpoint:
             "stream": True,
         }
 
-    @patch("src.api.endpoints.chat._ai_service")
     async def test_streaming_chat_endpoint(
-        self, mock_service, client, streaming_request, mock_streaming_response
+        self, override_ai_service, client, streaming_request, mock_streaming_response
     ):
         """Test streaming chat endpoint."""
         # Mock the streaming response
-        mock_service.generate_streaming_response = AsyncMock(
+        override_ai_service.generate_streaming_response = AsyncMock(
             return_value=mock_streaming_response
         )
 
@@ -293,11 +276,6 @@ class TestChatStreamingEndpoint:
 class TestAPIErrorHandling:
     """Test API error handling and edge cases."""
 
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-
     def test_invalid_json_request(self, client):
         """Test handling of invalid JSON."""
         response = client.post(
@@ -346,11 +324,6 @@ class TestAPIErrorHandling:
 class TestAPICORS:
     """Test CORS configuration."""
 
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-
     def test_cors_preflight_request(self, client):
         """Test CORS preflight request."""
         response = client.options(
@@ -387,11 +360,6 @@ class TestAPICORS:
 class TestAPIDocumentation:
     """Test API documentation endpoints."""
 
-    @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return TestClient(app)
-
     def test_openapi_schema(self, client):
         """Test OpenAPI schema endpoint."""
         response = client.get("/openapi.json")
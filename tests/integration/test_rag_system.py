@@ -198,6 +198,8 @@ class TestRAGService:
         settings.max_tokens = 1000
         settings.rag_max_search_results = 5
         settings.rag_min_confidence_score = 0.7
+        settings.max_conversations = 10000
+        settings.conversation_ttl_seconds = 3600
         return settings
 
     @pytest.fixture
@@ -306,11 +306,12 @@ class TestAzureOpenAIService:
         assert history[2].content == "Second message"
         assert history[3].content == "First response"  # Mock returns same response
 
-    async def test_conversation_history_limit(self, service):
+    async def test_conversation_history_limit(self, service, isolated_test_settings):
         """Test conversation history respects max_history_messages limit."""
         conv_id = "test_conv_limit"
 
         # Create service with small history limit for testing
+        service.settings = isolated_test_settings
         service.settings.max_conversation_history = 4  # System + 3 messages
 
         mock_completion = ChatCompletion(
@@ -65,6 +65,16 @@ class TestChatMessage:
         with pytest.raises(ValidationError):
             ChatMessage(content="x" * 4001, role="user")
 
+    def test_chat_message_is_immutable(self):
+        """Test that messages cannot be modified or given unknown fields."""
+        message = ChatMessage(content="Test", role="user")
+
+        with pytest.raises(ValidationError):
+            message.content = "Changed"
+
+        with pytest.raises(ValidationError):
+            ChatMessage(content="Test", role="user", extra_field="x")
+
     def test_message_serialization(self):
         """Test message serialization to dict/JSON."""
         message = ChatMessage(content="Test", role="user")
@@ -0,0 +1,243 @@
+"""
+Unit tests for the MonitoringAlertsService.
+
+These tests drive the precompiled rule evaluators directly so the alert
+lifecycle (tracking, firing after the duration window, notifying once,
+resolving) can be verified without the background monitoring loop.
+"""
+
+import orjson
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+from src.services.monitoring_alerts import (
+    AlertRule,
+    AlertSeverity,
+    AlertStatus,
+    MonitoringAlertsService,
+)
+from src.services.monitoring_service import MonitoringService
+
+
+class TestMonitoringAlertsService:
+    """Test alert rule evaluation and notification delivery."""
+
+    @pytest.fixture
+    def alerts_service(self, test_settings):
+        """Create an alerts service with no default rules."""
+        service = MonitoringAlertsService(test_settings, MonitoringService(test_settings))
+        for rule_name in list(service.alert_rules):
+            service.remove_alert_rule(rule_name)
+        return service
+
+    @pytest.fixture
+    def warning_rule(self):
+        """A non-critical rule that must persist before firing."""
+        return AlertRule(
+            name="slow_responses",
+            description="Average response time is high",
+            metric_name="avg_response_time_ms",
+            threshold=1000.0,
+            comparison="gt",
+            severity=AlertSeverity.WARNING,
+            duration_minutes=5,
+        )
+
+    async def test_duration_alert_notifies_only_once(
+        self, alerts_service, warning_rule
+    ):
+        """A persisting condition fires once, not on every later tick."""
+        handler = AsyncMock()
+        alerts_service.add_notification_handler(handler)
+        alerts_service.add_alert_rule(warning_rule)
+        evaluate = alerts_service._rule_evaluators[warning_rule.name]
+
+        await evaluate({"avg_response_time_ms": 1500.0})
+        handler.assert_not_awaited()
+
+        alert = alerts_service.active_alerts["slow_responses_avg_response_time_ms"]
+        alert.fired_at = datetime.utcnow() - timedelta(minutes=6)
+
+        for _ in range(3):
+            await evaluate({"avg_response_time_ms": 1600.0})
+
+        handler.assert_awaited_once_with(alert)
+        assert alert.status == AlertStatus.ACTIVE
+        assert alert.current_value == 1600.0
+
+    async def test_critical_alert_is_not_renotified(self, alerts_service):
+        """Critical alerts fire immediately and are not re-fired by duration."""
+        handler = AsyncMock()
+        alerts_service.add_notification_handler(handler)
+        alerts_service.add_alert_rule(
+            AlertRule(
+                name="service_down",
+                description="AI service is down",
+                metric_name="ai_service_health",
+                threshold=0.0,
+                comparison="eq",
+                severity=AlertSeverity.CRITICAL,
+                duration_minutes=0,
+            )
+        )
+        evaluate = alerts_service._rule_evaluators["service_down"]
+
+        await evaluate({"ai_service_health": 0.0})
+        await evaluate({"ai_service_health": 0.0})
+
+        handler.assert_awaited_once()
+
+    async def test_payload_is_serialized_once_per_fire(
+        self, alerts_service, warning_rule
+    ):
+        """Handlers share one payload per fire; a new fire re-serializes it."""
+        payloads = []
+        for _ in range(2):
+            alerts_service.add_notification_handler(
+                lambda alert: payloads.append(alert.to_json_bytes())
+            )
+        alerts_service.add_alert_rule(warning_rule)
+        await alerts_service._rule_evaluators[warning_rule.name](
+            {"avg_response_time_ms": 1500.0}
+        )
+        alert = alerts_service.active_alerts["slow_responses_avg_response_time_ms"]
+
+        await alerts_service._fire_alert(alert)
+        alert.current_value = 2000.0
+        await alerts_service._fire_alert(alert)
+
+        assert len(payloads) == 4
+        assert payloads[0] is payloads[1]
+        assert payloads[2] is payloads[3]
+        first, second = orjson.loads(payloads[0]), orjson.loads(payloads[2])
+        assert first["current_value"] == 1500.0
+        assert second["current_value"] == 2000.0
+        assert first["severity"] == "warning"
+        assert first["status"] == "active"
+
+    async def test_alert_resolves_when_condition_clears(
+        self, alerts_service, warning_rule
+    ):
+        """Clearing the condition moves the alert into history."""
+        alerts_service.add_alert_rule(warning_rule)
+        evaluate = alerts_service._rule_evaluators[warning_rule.name]
+
+        await evaluate({"avg_response_time_ms": 1500.0})
+        await evaluate({"avg_response_time_ms": 200.0})
+
+        assert alerts_service.active_alerts == {}
+        assert alerts_service.alert_history[-1].status == AlertStatus.RESOLVED
+
+    async def test_observe_log_is_debounced_per_rule(
+        self, alerts_service, warning_rule, monkeypatch
+    ):
+        """A flapping rule logs "monitoring duration" once per window per rule."""
+        now = [1000.0]
+        monkeypatch.setattr(
+            "src.services.monitoring_alerts.time.monotonic", lambda: now[0]
+        )
+        logger = Mock()
+        monkeypatch.setattr("src.services.monitoring_alerts.logger", logger)
+        alerts_service.add_alert_rule(warning_rule)
+        alerts_service.add_alert_rule(
+            AlertRule(
+                name="many_errors",
+                description="Too many errors",
+                metric_name="total_errors",
+                threshold=5.0,
+                comparison="gt",
+                severity=AlertSeverity.WARNING,
+            )
+        )
+        slow = alerts_service._rule_evaluators[warning_rule.name]
+        errors = alerts_service._rule_evaluators["many_errors"]
+
+        async def flap(evaluate, metric, value, clear_value):
+            # Breach (starting a new tracked alert), then clear it again
+            await evaluate({metric: value})
+            await evaluate({metric: clear_value})
+
+        def observe_logs():
+            return [
+                call.kwargs["rule_name"]
+                for call in logger.info.call_args_list
+                if call.args == ("Alert condition detected, monitoring duration",)
+            ]
+
+        await flap(slow, "avg_response_time_ms", 1500.0, 200.0)
+        now[0] += 30
+        await flap(slow, "avg_response_time_ms", 1500.0, 200.0)
+        await flap(errors, "total_errors", 8.0, 0.0)
+        assert observe_logs() == ["slow_responses", "many_errors"]
+
+        now[0] += 31
+        await flap(slow, "avg_response_time_ms", 1500.0, 200.0)
+        await flap(errors, "total_errors", 8.0, 0.0)
+        assert observe_logs() == ["slow_responses", "many_errors", "slow_responses"]
+
+    def test_derived_metrics_use_family_totals(self, alerts_service):
+        """Error rate and token usage are derived from counter family totals."""
+        metrics = alerts_service._calculate_derived_metrics(
+            {},
+            {
+                "metrics": {
+                    "family_totals": {
+                        "chat_requests_total": 20,
+                        "errors_total": 3,
+                        "operation_errors_total": 2,
+                        "ai_tokens_used_total": 1500,
+                    },
+                    "histogram_summaries": {
+                        "chat_response_time_ms[endpoint=POST /api/chat]": {"avg": 850.0}
+                    },
+                }
+            },
+        )
+
+        assert metrics["total_requests"] == 20
+        assert metrics["total_errors"] == 5
+        assert metrics["error_rate_percentage"] == 25.0
+        assert metrics["tokens_per_hour"] == 1500
+        assert metrics["avg_response_time_ms"] == 850.0
+
+    async def test_rules_can_change_during_check(self, alerts_service, warning_rule):
+        """Handlers that register rules do not break the rule sweep."""
+
+        def mutate_rules(alert):
+            alerts_service.add_alert_rule(
+                AlertRule(
+                    name="added_by_handler",
+                    description="Rule registered from a notification handler",
+                    metric_name="total_errors",
+                    threshold=10.0,
+                    comparison="gt",
+                    severity=AlertSeverity.INFO,
+                )
+            )
+
+        warning_rule.severity = AlertSeverity.CRITICAL
+        alerts_service.add_alert_rule(warning_rule)
+        alerts_service.add_alert_rule(
+            AlertRule(
+                name="many_errors",
+                description="Too many errors",
+                metric_name="total_errors",
+                threshold=5.0,
+                comparison="gt",
+                severity=AlertSeverity.WARNING,
+            )
+        )
+        alerts_service.add_notification_handler(mutate_rules)
+        alerts_service._calculate_derived_metrics = Mock(
+            return_value={"avg_response_time_ms": 1500.0, "total_errors": 8.0}
+        )
+        alerts_service.monitoring.get_health_metrics = AsyncMock(return_value={})
+        alerts_service.monitoring.get_metrics_export = AsyncMock(return_value={})
+
+        await alerts_service._check_alert_rules()
+
+        assert "added_by_handler" in alerts_service.alert_rules
+        assert "slow_responses_avg_response_time_ms" in alerts_service.active_alerts
+        # Rules after the mutating one are still evaluated in the same sweep
+        assert "many_errors_total_errors" in alerts_service.active_alerts
@@ -0,0 +1,298 @@
+"""
+Unit tests for the monitoring dashboard endpoints.
+
+Route handlers are called directly with a mocked monitoring service so
+caching and payload building can be checked without a running app.
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from starlette.requests import Request
+
+import src.api.endpoints.health as health
+import src.services.monitoring_dashboard as dashboard
+from src.services.monitoring_service import MonitoringService
+
+
+@pytest.fixture
+def monitoring():
+    """Monitoring service double returning fixed metrics."""
+    service = Mock()
+    service.app_insights_enabled = False
+    service.settings = Mock(app_version="1.0.0", environment="production")
+    service.get_health_metrics = AsyncMock(
+        return_value={"status": "healthy", "uptime_hours": 2.5}
+    )
+    service.get_metrics_export = AsyncMock(
+        return_value={
+            "metrics": {
+                "counters": {"chat_requests_total[status=success]": 4},
+                "family_totals": {"chat_requests_total": 4},
+                "histogram_summaries": {},
+                "gauges": {},
+            }
+        }
+    )
+    return service
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics_cache():
+    """Isolate the module-level metrics cache between tests."""
+    dashboard._metrics_cache.clear()
+    yield
+    dashboard._metrics_cache.clear()
+
+
+class TestDashboardMetricsCache:
+    """Test the short-lived per-timeframe metrics API cache."""
+
+    async def test_repeated_polls_are_served_from_cache(self, monitoring):
+        """Polls within the TTL reuse the cached payload."""
+        first = await dashboard.dashboard_metrics_api(monitoring, "1h")
+        second = await dashboard.dashboard_metrics_api(monitoring, "1h")
+
+        assert first.body == second.body
+        assert monitoring.get_metrics_export.await_count == 1
+        assert second.headers["cache-control"] == "public, max-age=10"
+
+    async def test_timestamps_use_z_suffix(self, monitoring):
+        """Timestamps keep the "Z" UTC format used by the other endpoints."""
+        response = await dashboard.dashboard_metrics_api(monitoring, "1h")
+        body = json.loads(response.body)
+
+        assert body["timestamp"].endswith("Z")
+        assert body["time_window"].endswith("Z")
+        assert "+00:00" not in response.body.decode()
+
+    async def test_summary_uses_family_totals(self, monitoring):
+        """Summary counts come from per-family totals."""
+        monitoring.get_metrics_export.return_value["metrics"]["family_totals"] = {
+            "chat_requests_total": 8,
+            "errors_total": 1,
+            "operation_errors_total": 1,
+        }
+
+        response = await dashboard.dashboard_metrics_api(monitoring, "1h")
+        summary = json.loads(response.body)["summary"]
+
+        assert summary["total_requests"] == 8
+        assert summary["error_rate"] == 25.0
+
+    async def test_cache_expires_after_ttl(self, monitoring, monkeypatch):
+        """Payloads older than the TTL are rebuilt."""
+        now = [1000.0]
+        monkeypatch.setattr(dashboard.time, "monotonic", lambda: now[0])
+
+        await dashboard.dashboard_metrics_api(monitoring, "1h")
+        now[0] += dashboard._METRICS_CACHE_TTL_SECONDS + 0.1
+        await dashboard.dashboard_metrics_api(monitoring, "1h")
+
+        assert monitoring.get_metrics_export.await_count == 2
+
+    async def test_cache_is_per_timeframe(self, monitoring):
+        """Each timeframe has its own cache entry."""
+        await dashboard.dashboard_metrics_api(monitoring, "1h")
+        await dashboard.dashboard_metrics_api(monitoring, "6h")
+
+        assert monitoring.get_metrics_export.await_count == 2
+        assert set(dashboard._metrics_cache) == {"1h", "6h"}
+
+    async def test_unknown_timeframes_are_not_cached(self, monitoring):
+        """Arbitrary query values cannot grow the cache."""
+        await dashboard.dashboard_metrics_api(monitoring, "999h")
+
+        assert dashboard._metrics_cache == {}
+
+    async def test_failures_are_not_cached(self, monitoring):
+        """A failed aggregation returns 503 and leaves the cache empty."""
+        monitoring.get_health_metrics.side_effect = RuntimeError("down")
+
+        with pytest.raises(dashboard.HTTPException) as exc_info:
+            await dashboard.dashboard_metrics_api(monitoring, "1h")
+
+        assert exc_info.value.status_code == 503
+        assert dashboard._metrics_cache == {}
+
+
+class TestDashboardMetricsStream:
+    """Test the shared SSE publisher and its subscribers."""
+
+    @pytest.fixture(autouse=True)
+    def fast_stream(self, monkeypatch):
+        """Publish without delay and start each test with no subscribers."""
+        monkeypatch.setattr(dashboard, "_STREAM_INTERVAL_SECONDS", 0)
+        dashboard._stream_subscribers.clear()
+        yield
+        dashboard._stream_subscribers.clear()
+
+    @pytest.fixture
+    def monitoring(self, test_settings):
+        """Real monitoring service so the shared report builder is exercised."""
+        return MonitoringService(test_settings)
+
+    async def test_payload_matches_health_metrics_endpoint(
+        self, monitoring, test_settings, monkeypatch
+    ):
+        """The stream pushes the same document shape as /health/metrics."""
+        monkeypatch.setattr(health, "get_monitoring_service", lambda settings: monitoring)
+        queue = asyncio.Queue(maxsize=1)
+        dashboard._stream_subscribers.add(queue)
+        task = asyncio.create_task(dashboard._publish_metrics(monitoring))
+
+        streamed = json.loads(await asyncio.wait_for(queue.get(), 1))
+        dashboard._stream_subscribers.clear()
+        await asyncio.wait_for(task, 1)
+        report = json.loads((await health.metrics_endpoint(test_settings)).body)
+
+        assert streamed.keys() == report.keys()
+        assert streamed["environment"] == "production"
+        assert streamed["timestamp"].endswith("Z")
+
+    async def test_publisher_fans_out_to_all_subscribers(self, monitoring):
+        """One aggregation is delivered to every connected client."""
+        monitoring.get_metrics_report = AsyncMock(return_value={"version": "1"})
+        queues = [asyncio.Queue(maxsize=1) for _ in range(3)]
+        dashboard._stream_subscribers.update(queues)
+        task = asyncio.create_task(dashboard._publish_metrics(monitoring))
+
+        received = [await asyncio.wait_for(queue.get(), 1) for queue in queues]
+        dashboard._stream_subscribers.clear()
+        await asyncio.wait_for(task, 1)
+
+        assert received == ['{"version":"1"}'] * 3
+
+    async def test_slow_subscriber_keeps_latest_snapshot(self, monitoring):
+        """A client that falls behind only sees the newest payload."""
+        monitoring.get_metrics_report = AsyncMock(
+            side_effect=[{"n": 1}, {"n": 2}, {"n": 3}]
+        )
+        queue = asyncio.Queue(maxsize=1)
+        dashboard._stream_subscribers.add(queue)
+        task = asyncio.create_task(dashboard._publish_metrics(monitoring))
+
+        while monitoring.get_metrics_report.await_count < 3:
+            await asyncio.sleep(0)
+        dashboard._stream_subscribers.clear()
+        await asyncio.wait_for(task, 1)
+
+        assert queue.qsize() == 1
+        assert json.loads(queue.get_nowait()) == {"n": 3}
+
+    async def test_publisher_stops_when_last_client_disconnects(self, monitoring):
+        """Closing the only stream ends the background aggregation task."""
+        monitoring.get_metrics_report = AsyncMock(return_value={"version": "1"})
+        response = await dashboard.dashboard_metrics_stream(monitoring)
+        events = response.body_iterator
+
+        first = await asyncio.wait_for(events.__anext__(), 1)
+        assert first.startswith("event: metrics\ndata: ")
+        assert len(dashboard._stream_subscribers) == 1
+
+        await events.aclose()
+        assert dashboard._stream_subscribers == set()
+        await asyncio.wait_for(dashboard._stream_task, 1)
+        assert dashboard._stream_task.done()
+
+
+class TestDashboardPage:
+    """Test content negotiation and revalidation for the dashboard page."""
+
+    @staticmethod
+    def make_request(**headers) -> Request:
+        raw = [
+            (name.replace("_", "-").encode(), value.encode())
+            for name, value in headers.items()
+        ]
+        return Request({"type": "http", "method": "GET", "headers": raw})
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            ("gzip, deflate, br", True),
+            ("br;q=1.0, gzip;q=0.8", True),
+            ("GZIP", True),
+            ("x-gzip", True),
+            ("*", True),
+            ("gzip;q=0", False),
+            ("gzip;q=0.0, deflate", False),
+            ("*;q=0", False),
+            ("gzip;q=0, *", False),
+            ("deflate, br", False),
+            ("identity", False),
+            ("", False),
+        ],
+    )
+    def test_accepts_gzip(self, accept_encoding, expected):
+        """Accept-Encoding is parsed with q-values rather than substring matched."""
+        assert dashboard._accepts_gzip(accept_encoding) is expected
+
+    async def test_gzip_refused_with_zero_q(self):
+        """Clients that refuse gzip get the identity representation."""
+        response = await dashboard.monitoring_dashboard(
+            self.make_request(accept_encoding="gzip;q=0, identity")
+        )
+
+        assert "content-encoding" not in response.headers
+        assert response.body == dashboard._DASHBOARD_HTML_BYTES
+        assert response.headers["etag"] == dashboard._DASHBOARD_ETAG
+
+    async def test_gzip_representation_has_its_own_etag(self):
+        """Each content-coding is served with a distinct ETag."""
+        gzipped = await dashboard.monitoring_dashboard(
+            self.make_request(accept_encoding="gzip")
+        )
+        plain = await dashboard.monitoring_dashboard(self.make_request())
+
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.headers["etag"] == dashboard._DASHBOARD_ETAG_GZIP
+        assert plain.headers["etag"] == dashboard._DASHBOARD_ETAG
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+        assert gzipped.headers["vary"] == "Accept-Encoding"
+
+    @pytest.mark.parametrize(
+        "if_none_match",
+        [
+            dashboard._DASHBOARD_ETAG,
+            f"W/{dashboard._DASHBOARD_ETAG}",
+            "*",
+            f'"stale", {dashboard._DASHBOARD_ETAG}',
+            f'"stale",W/{dashboard._DASHBOARD_ETAG} , "other"',
+        ],
+    )
+    async def test_matching_validator_returns_304(self, if_none_match):
+        """Strong, weak, wildcard and list validators all revalidate."""
+        response = await dashboard.monitoring_dashboard(
+            self.make_request(if_none_match=if_none_match)
+        )
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == dashboard._DASHBOARD_ETAG
+
+    @pytest.mark.parametrize(
+        "if_none_match",
+        ['"stale"', dashboard._DASHBOARD_ETAG_GZIP, '"stale", "other"'],
+    )
+    async def test_non_matching_validator_returns_page(self, if_none_match):
+        """Other representations' ETags do not match the identity page."""
+        response = await dashboard.monitoring_dashboard(
+            self.make_request(if_none_match=if_none_match)
+        )
+
+        assert response.status_code == 200
+        assert response.body == dashboard._DASHBOARD_HTML_BYTES
+
+    async def test_gzip_etag_revalidates_gzip_request(self):
+        """A cached gzip copy revalidates against the gzip ETag."""
+        response = await dashboard.monitoring_dashboard(
+            self.make_request(
+                accept_encoding="gzip",
+                if_none_match=f"W/{dashboard._DASHBOARD_ETAG_GZIP}",
+            )
+        )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == dashboard._DASHBOARD_ETAG_GZIP
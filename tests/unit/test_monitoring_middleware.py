@@ -0,0 +1,241 @@
+"""
+Unit tests for the MonitoringMiddleware.
+
+The middleware is a raw ASGI callable, so these tests drive it with a
+minimal ASGI app and capture the messages it forwards to the server,
+without going through FastAPI or a test client.
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from src.services.monitoring_middleware import MonitoringMiddleware, _new_request_id
+from src.services.monitoring_service import MonitoringService
+
+
+def make_scope(path: str = "/api/v1/chat", method: str = "POST", **extra) -> dict:
+    """Build a minimal HTTP scope."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(b"user-agent", b"pytest")],
+        "client": ("127.0.0.1", 12345),
+    }
+    scope.update(extra)
+    return scope
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def make_app(status: int = 200, seen_scopes: list = None):
+    """Create an ASGI app that sends a plain response and records its scope."""
+
+    async def app(scope, receive, send):
+        if seen_scopes is not None:
+            seen_scopes.append(scope)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+class TestMonitoringMiddleware:
+    """Test the raw ASGI monitoring middleware."""
+
+    @pytest.fixture
+    def monitoring(self, test_settings):
+        """In-memory monitoring service (no Application Insights)."""
+        return MonitoringService(test_settings)
+
+    @pytest.fixture
+    def sent(self):
+        """Messages forwarded by the middleware."""
+        return []
+
+    @pytest.fixture
+    def send(self, sent):
+        async def send(message):
+            sent.append(message)
+
+        return send
+
+    def build(self, app, monitoring) -> MonitoringMiddleware:
+        middleware = MonitoringMiddleware(app)
+        middleware._monitoring = monitoring
+        return middleware
+
+    async def test_adds_monitoring_headers(self, monitoring, send, sent):
+        """Response start carries X-Request-ID and X-Response-Time."""
+        middleware = self.build(make_app(), monitoring)
+
+        await middleware(make_scope(), receive, send)
+
+        start = sent[0]
+        headers = dict(start["headers"])
+        assert start["type"] == "http.response.start"
+        assert headers[b"x-request-id"]
+        assert headers[b"x-response-time"].endswith(b"ms")
+        assert headers[b"content-type"] == b"text/plain"
+        assert sent[1] == {"type": "http.response.body", "body": b"ok"}
+
+    async def test_request_id_shared_with_request_state(
+        self, monitoring, send, sent
+    ):
+        """The generated request ID is stored in scope["state"] for request.state."""
+        seen = []
+        middleware = self.build(make_app(seen_scopes=seen), monitoring)
+
+        await middleware(make_scope(), receive, send)
+
+        request_id = seen[0]["state"]["request_id"]
+        assert dict(sent[0]["headers"])[b"x-request-id"] == request_id.encode()
+
+    async def test_existing_request_id_is_reused(self, monitoring, send, sent):
+        """An upstream request ID in the scope state is not replaced."""
+        middleware = self.build(make_app(), monitoring)
+
+        await middleware(
+            make_scope(state={"request_id": "upstream-id"}), receive, send
+        )
+
+        assert dict(sent[0]["headers"])[b"x-request-id"] == b"upstream-id"
+
+    async def test_records_chat_request_metrics(self, monitoring, send):
+        """Completed requests are counted by route template and status."""
+        route = Mock(path="/api/v1/sessions/{session_id}")
+        middleware = self.build(make_app(status=404), monitoring)
+
+        for _ in range(2):
+            await middleware(
+                make_scope(path="/api/v1/sessions/abc", method="GET", route=route),
+                receive,
+                send,
+            )
+
+        counters = monitoring.metrics.counters
+        key = monitoring.metrics._make_key(
+            "chat_requests_total",
+            {"endpoint": "GET /api/v1/sessions/{session_id}", "status": "error"},
+        )
+        assert counters[key] == 2
+        assert len(middleware._chat_recorders) == 1
+
+    async def test_unmatched_paths_share_one_label(self, monitoring, send):
+        """404s for arbitrary paths do not create a metric series per path."""
+        middleware = self.build(make_app(status=404), monitoring)
+
+        for path in ("/wp-admin", "/.env", "/api/v1/nope/123"):
+            await middleware(make_scope(path=path, method="GET"), receive, send)
+
+        key = monitoring.metrics._make_key(
+            "chat_requests_total",
+            {"endpoint": "GET <unmatched>", "status": "error"},
+        )
+        assert dict(monitoring.metrics.counters) == {key: 3}
+        assert list(middleware._chat_recorders) == [("GET", "<unmatched>", "error")]
+
+    async def test_operation_metrics_recorded_without_tracing(
+        self, monitoring, send
+    ):
+        """Skipping trace_request still feeds the operation metrics tables."""
+        route = Mock(path="/api/v1/chat")
+        middleware = self.build(make_app(), monitoring)
+
+        await middleware(make_scope(route=route), receive, send)
+
+        histograms = monitoring.metrics.get_metrics_summary()["histogram_summaries"]
+        key = monitoring.metrics._make_key(
+            "operation_duration_ms", {"operation": "POST /api/v1/chat"}
+        )
+        assert histograms[key]["count"] == 1
+
+    async def test_operation_errors_recorded_without_tracing(self, monitoring, send):
+        """Endpoint failures count towards operation_errors_total."""
+
+        async def failing_app(scope, receive, send):
+            scope["route"] = Mock(path="/api/v1/chat")
+            raise RuntimeError("boom")
+
+        middleware = self.build(failing_app, monitoring)
+
+        with pytest.raises(RuntimeError):
+            await middleware(make_scope(), receive, send)
+
+        key = monitoring.metrics._make_key(
+            "operation_errors_total",
+            {"operation": "POST /api/v1/chat", "error_type": "RuntimeError"},
+        )
+        assert monitoring.metrics.counters[key] == 1
+
+    async def test_exception_is_recorded_and_reraised(self, monitoring, send, sent):
+        """Endpoint exceptions record an error metric and propagate."""
+        monitoring.record_error = Mock()
+
+        async def failing_app(scope, receive, send):
+            raise ValueError("boom")
+
+        middleware = self.build(failing_app, monitoring)
+
+        with pytest.raises(ValueError, match="boom"):
+            await middleware(make_scope(), receive, send)
+
+        monitoring.record_error.assert_called_once()
+        kwargs = monitoring.record_error.call_args.kwargs
+        assert kwargs["error_type"] == "ValueError"
+        assert kwargs["endpoint"].startswith("POST ")
+        assert sent == []
+        assert middleware._chat_recorders == {}
+
+    async def test_no_metrics_without_response(self, monitoring, send, sent):
+        """Apps that never start a response are not counted as requests."""
+
+        async def silent_app(scope, receive, send):
+            return None
+
+        middleware = self.build(silent_app, monitoring)
+
+        await middleware(make_scope(), receive, send)
+
+        assert sent == []
+        assert middleware._chat_recorders == {}
+        assert not monitoring.metrics.counters
+
+    @pytest.mark.parametrize("path", ["/api/v1/health", "/metrics", "/favicon.ico"])
+    async def test_excluded_paths_pass_through(self, monitoring, send, sent, path):
+        """Probe and static paths skip monitoring entirely."""
+        middleware = self.build(make_app(), monitoring)
+
+        await middleware(make_scope(path=path, method="GET"), receive, send)
+
+        assert b"x-request-id" not in dict(sent[0]["headers"])
+        assert not monitoring.metrics.counters
+
+    async def test_non_http_scopes_pass_through(self, monitoring):
+        """Lifespan and websocket scopes are forwarded untouched."""
+        app = Mock()
+
+        async def inner(scope, receive, send):
+            app(scope)
+
+        middleware = self.build(inner, monitoring)
+        scope = {"type": "lifespan"}
+
+        await middleware(scope, receive, None)
+
+        app.assert_called_once_with(scope)
+        assert "state" not in scope
+
+
+def test_request_ids_are_unique():
+    """Request IDs do not repeat within a process."""
+    ids = {_new_request_id() for _ in range(1000)}
+    assert len(ids) == 1000
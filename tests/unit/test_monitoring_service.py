@@ -0,0 +1,350 @@
+"""
+Unit tests for the MonitoringService and its in-memory MetricsCollector.
+"""
+
+import json
+import logging
+import pytest
+from unittest.mock import Mock
+
+import src.services.monitoring_service as monitoring_service
+from src.services.monitoring_service import MetricsCollector, MonitoringService
+
+
+class TestMetricsCollector:
+    """Test in-memory metric recording."""
+
+    @pytest.fixture
+    def collector(self):
+        return MetricsCollector()
+
+    def test_make_key_is_independent_of_tag_order(self, collector):
+        """Equal tag sets map to one key regardless of dict order."""
+        first = collector._make_key("requests_total", {"b": "2", "a": "1"})
+        second = collector._make_key("requests_total", {"a": "1", "b": "2"})
+
+        assert first == second == "requests_total[a=1,b=2]"
+        assert len(collector._key_cache) == 1
+
+    def test_tag_strings_are_shared_across_metric_names(self, collector):
+        """Metrics recorded with the same tags reuse one canonical tag string."""
+        tags = {"type": "knowledge_search"}
+
+        assert collector._make_key("search_queries_total", tags) == (
+            "search_queries_total[type=knowledge_search]"
+        )
+        assert collector._make_key("search_duration_ms", tags) == (
+            "search_duration_ms[type=knowledge_search]"
+        )
+        assert len(collector._tag_strings) == 1
+        assert len(collector._key_cache) == 2
+
+    def test_make_key_cache_is_bounded(self, collector, monkeypatch):
+        """The key cache evicts its oldest entries once full."""
+        monkeypatch.setattr("src.services.monitoring_service._KEY_CACHE_SIZE", 3)
+
+        for i in range(5):
+            collector._make_key("requests_total", {"id": str(i)})
+
+        assert len(collector._key_cache) == 3
+        assert ("requests_total", frozenset({("id", "0")})) not in collector._key_cache
+        assert collector._make_key("requests_total", {"id": "0"}) == (
+            "requests_total[id=0]"
+        )
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 4])
+    def test_format_tags_matches_generic_join(self, size):
+        """The unrolled small-tag paths produce the generic canonical form."""
+        tags = {f"t{i}": str(i) for i in reversed(range(size))}
+
+        assert MetricsCollector._format_tags(tags) == ",".join(
+            f"{k}={v}" for k, v in sorted(tags.items())
+        )
+
+    def test_make_key_handles_unhashable_tags(self, collector):
+        """Unhashable tag values fall back to building the key directly."""
+        key = collector._make_key("requests_total", {"ids": ["a", "b"]})
+
+        assert key == "requests_total[ids=['a', 'b']]"
+        assert collector._key_cache == {}
+
+    def test_counter_incrementer_shares_key_with_increment_counter(self, collector):
+        """Prebuilt incrementers update the same series as increment_counter."""
+        tags = {"endpoint": "POST /api/v1/chat", "status": "success"}
+        increment = collector.counter_incrementer("chat_requests_total", tags)
+
+        increment()
+        increment(2)
+        collector.increment_counter("chat_requests_total", tags=tags)
+
+        assert collector.get_metrics_summary()["counters"] == {
+            collector._make_key("chat_requests_total", tags): 4
+        }
+
+    def test_histogram_recorder_shares_key_with_record_histogram(self, collector):
+        """Prebuilt histogram recorders feed the same summary."""
+        tags = {"endpoint": "POST /api/v1/chat"}
+        record = collector.histogram_recorder("chat_response_time_ms", tags)
+
+        record(100.0)
+        collector.record_histogram("chat_response_time_ms", 300.0, tags=tags)
+
+        summary = collector.get_metrics_summary()["histogram_summaries"]
+        assert summary[collector._make_key("chat_response_time_ms", tags)] == {
+            "count": 2,
+            "avg": 200.0,
+            "min": 100.0,
+            "max": 300.0,
+            "p50": 100.0,
+            "p95": 300.0,
+            "p99": 300.0,
+        }
+
+    def test_summary_returns_read_only_views(self, collector):
+        """Counters and gauges are exposed as views, not copied per summary."""
+        collector.increment_counter("requests_total")
+        summary = collector.get_metrics_summary()
+
+        with pytest.raises(TypeError):
+            summary["counters"]["requests_total"] = 0
+
+        collector.increment_counter("requests_total")
+        assert summary["counters"]["requests_total"] == 2
+
+    def test_to_json_bytes_matches_summary(self, collector):
+        """The orjson export encodes the same data as the summary."""
+        collector.increment_counter("requests_total", tags={"status": "ok"})
+        collector.record_histogram("latency_ms", 5.0)
+
+        exported = json.loads(collector.to_json_bytes())
+
+        assert exported["counters"] == {"requests_total[status=ok]": 1}
+        assert exported["histogram_summaries"]["latency_ms"]["avg"] == 5.0
+
+    def test_histogram_summary_uses_running_aggregates(self, collector):
+        """Aggregates cover every sample, not just the retained window."""
+        window = collector.histograms["latency_ms"].samples.maxlen
+        for value in range(window + 10):
+            collector.record_histogram("latency_ms", float(value))
+
+        histogram = collector.histograms["latency_ms"]
+        summary = collector.get_metrics_summary()["histogram_summaries"]["latency_ms"]
+        assert len(histogram.samples) == window
+        assert summary["count"] == window + 10
+        assert summary["avg"] == (window + 9) / 2
+        assert summary["min"] == 0.0
+        assert summary["max"] == float(window + 9)
+
+    def test_histogram_percentiles_use_sample_window(self, collector):
+        """Percentiles are nearest-rank over the retained samples."""
+        for value in range(1, 101):
+            collector.record_histogram("latency_ms", float(value))
+
+        summary = collector.get_metrics_summary()["histogram_summaries"]["latency_ms"]
+        assert (summary["p50"], summary["p95"], summary["p99"]) == (50.0, 95.0, 99.0)
+
+    def test_histogram_percentiles_are_reused_until_new_samples(self, collector):
+        """Unchanged histograms are not re-sorted on every export."""
+        collector.record_histogram("latency_ms", 10.0)
+        histogram = collector.histograms["latency_ms"]
+
+        first = histogram.percentiles()
+        assert histogram.percentiles() is first
+
+        collector.record_histogram("latency_ms", 30.0)
+        second = histogram.percentiles()
+        assert second is not first
+        assert second["p99"] == 30.0
+
+    async def test_large_summaries_are_built_off_the_event_loop(
+        self, collector, monkeypatch
+    ):
+        """Collectors past the inline threshold are summarized in a worker thread."""
+        calls = []
+
+        async def fake_to_thread(func):
+            calls.append(func)
+            return func()
+
+        monkeypatch.setattr(
+            "src.services.monitoring_service.asyncio.to_thread", fake_to_thread
+        )
+        monkeypatch.setattr(
+            "src.services.monitoring_service._SUMMARY_INLINE_MAX_SERIES", 2
+        )
+        collector.increment_counter("a_total")
+        collector.record_histogram("b_ms", 1.0)
+        inline = await collector.get_metrics_summary_async()
+
+        collector.set_gauge("c", 1.0)
+        threaded = await collector.get_metrics_summary_async()
+
+        assert calls == [collector.get_metrics_summary]
+        assert inline["counters"] == threaded["counters"] == {"a_total": 1}
+        assert threaded["gauges"] == {"c": 1.0}
+
+
+class TestMonitoringService:
+    """Test MonitoringService recording helpers."""
+
+    @pytest.fixture
+    def monitoring(self, test_settings):
+        return MonitoringService(test_settings)
+
+    async def test_chat_request_recorder_matches_record_chat_request(
+        self, monitoring
+    ):
+        """The cached recorder and record_chat_request produce the same series."""
+        record = monitoring.get_chat_request_recorder("POST", "/api/v1/chat", "success")
+
+        record(120.0)
+        monitoring.record_chat_request(
+            endpoint="POST /api/v1/chat", status="success", response_time_ms=80.0
+        )
+
+        summary = (await monitoring.get_metrics_export())["metrics"]
+        counter_key = monitoring.metrics._make_key(
+            "chat_requests_total",
+            {"endpoint": "POST /api/v1/chat", "status": "success"},
+        )
+        histogram_key = monitoring.metrics._make_key(
+            "chat_response_time_ms", {"endpoint": "POST /api/v1/chat"}
+        )
+        assert summary["counters"] == {counter_key: 2}
+        assert summary["histogram_summaries"][histogram_key]["avg"] == 100.0
+
+    async def test_health_metrics_use_family_totals(self, monitoring):
+        """Sample metrics sum every tag combination of a counter family."""
+        record = monitoring.get_chat_request_recorder("POST", "/api/v1/chat", "success")
+        record(10.0)
+        record(12.0)
+        monitoring.record_chat_request(
+            endpoint="POST /api/v1/chat", status="error", response_time_ms=5.0
+        )
+        monitoring.record_error("ValueError", "POST /api/v1/chat", "bad input")
+        monitoring.metrics.increment_counter(
+            "operation_errors_total", tags={"operation": "search"}
+        )
+
+        health = await monitoring.get_health_metrics()
+
+        assert health["metrics_summary"]["sample_metrics"] == {
+            "chat_requests": 3,
+            "errors": 2,
+        }
+
+    async def test_chat_recorders_are_cached_per_endpoint_and_status(
+        self, monitoring
+    ):
+        """Repeat endpoint/status pairs reuse one prebuilt recorder."""
+        for status in ("success", "success", "error"):
+            monitoring.record_chat_request(
+                endpoint="POST /api/chat", status=status, response_time_ms=1.0
+            )
+        await monitoring.flush_metrics()
+
+        assert set(monitoring._chat_series) == {
+            ("POST /api/chat", "success"),
+            ("POST /api/chat", "error"),
+        }
+        success_key = monitoring.metrics._make_key(
+            "chat_requests_total", {"endpoint": "POST /api/chat", "status": "success"}
+        )
+        assert monitoring.metrics.counters[success_key] == 2
+        assert monitoring.get_chat_request_recorder(
+            "POST", "/api/chat", "error"
+        ) is monitoring._chat_recorders[("POST /api/chat", "error")]
+
+    @pytest.mark.parametrize(
+        "level, expected_calls", [(logging.INFO, 1), (logging.WARNING, 0)]
+    )
+    def test_hot_path_logs_respect_level(
+        self, monitoring, monkeypatch, request, level, expected_calls
+    ):
+        """INFO analytics events are skipped entirely when INFO is disabled."""
+        fake_logger = Mock()
+        monkeypatch.setattr(monitoring_service, "logger", fake_logger)
+        stdlib_logger = monitoring_service._stdlib_logger
+        original_level = stdlib_logger.level
+        request.addfinalizer(lambda: stdlib_logger.setLevel(original_level))
+        stdlib_logger.setLevel(level)
+
+        monitoring.record_chat_request(
+            endpoint="POST /api/chat",
+            status="success",
+            response_time_ms=1.0,
+            user_id="user_123",
+        )
+
+        assert fake_logger.info.call_count == expected_calls
+        # Metrics are recorded either way
+        monitoring._apply_chat_events()
+        assert monitoring.metrics.family_totals["chat_requests_total"] == 1
+
+    async def test_failed_trace_logs_one_outcome_event(self, monitoring, monkeypatch):
+        """A failing operation logs "Operation failed" only, with its duration."""
+        fake_logger = Mock()
+        monkeypatch.setattr(monitoring_service, "logger", fake_logger)
+
+        with pytest.raises(ValueError):
+            async with monitoring.trace_request("search"):
+                raise ValueError("boom")
+
+        fake_logger.error.assert_called_once()
+        assert fake_logger.error.call_args.kwargs["error"] == "boom"
+        assert fake_logger.error.call_args.kwargs["duration_ms"] >= 0
+        assert "Operation completed" not in [
+            call.args[0] for call in fake_logger.info.call_args_list
+        ]
+        durations = monitoring.metrics.get_metrics_summary()["histogram_summaries"]
+        assert durations["operation_duration_ms[operation=search]"]["count"] == 1
+
+    async def test_chat_events_are_applied_in_batches(self, monitoring, monkeypatch):
+        """Chat events are queued, then applied with token counts coalesced."""
+        monkeypatch.setattr(monitoring_service, "_CHAT_EVENT_BATCH_SIZE", 3)
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "model": "gpt-4"}
+
+        for _ in range(2):
+            monitoring.record_chat_request(
+                endpoint="POST /api/chat",
+                status="success",
+                response_time_ms=100.0,
+                token_usage=usage,
+            )
+        assert len(monitoring._chat_events) == 2
+        assert not monitoring.metrics.counters
+
+        # The third event fills the batch and applies everything queued
+        monitoring.record_chat_request(
+            endpoint="POST /api/chat",
+            status="success",
+            response_time_ms=400.0,
+            token_usage=usage,
+        )
+
+        assert not monitoring._chat_events
+        prompt_key = monitoring.metrics._make_key(
+            "ai_tokens_used_total", {"model": "gpt-4", "type": "prompt_tokens"}
+        )
+        assert monitoring.metrics.counters[prompt_key] == 30
+        assert monitoring.metrics.family_totals["chat_requests_total"] == 3
+
+        # Reads apply partial batches too
+        monitoring.record_chat_request(
+            endpoint="POST /api/chat", status="error", response_time_ms=1.0
+        )
+        health = await monitoring.get_health_metrics()
+        assert health["metrics_summary"]["sample_metrics"]["chat_requests"] == 4
+
+    def test_error_ids_do_not_churn_user_hash_cache(self, monitoring):
+        """Per-request IDs passed to record_error bypass the user hash cache."""
+        monitoring_service._hash_identifier.cache_clear()
+
+        monitoring.record_error(
+            "ValueError", "POST /api/chat", "bad input", user_id="req-1"
+        )
+
+        assert monitoring_service._hash_identifier.cache_info().currsize == 0
+        assert monitoring_service._hash_identifier_uncached("req-1") == (
+            monitoring_service._hash_identifier("req-1")
+        )
@@ -0,0 +1,554 @@
+"""
+Unit tests for the RAGEnhancedAIService.
+
+The OpenAI and search clients are replaced with mocks, so these tests cover
+prompt assembly, caching and history handling without Azure access.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.models.chat_models import ChatMessage, ChatRequest
+from src.models.rag_models import DocumentType, SearchResult
+from src.services.cache_service import ExpiringLRUDict, SemanticResponseCache
+from src.services.rag_service import (
+    RAGEnhancedAIService,
+    _confidence_score,
+    _discard_stream,
+)
+
+
+@pytest.fixture
+def completion():
+    """Non-streaming chat completion returned by the mocked client."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = "Build a portfolio of ML projects."
+    response.model = "gpt-4"
+    response.usage.prompt_tokens = 50
+    response.usage.completion_tokens = 100
+    response.usage.total_tokens = 150
+    return response
+
+
+class FakeStream:
+    """Streaming completion yielding content deltas, with a closable response."""
+
+    def __init__(self, *contents):
+        self.contents = contents
+        self.response = MagicMock()
+        self.response.aclose = AsyncMock()
+
+    async def __aiter__(self):
+        for content in self.contents:
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = content
+            yield chunk
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+@pytest.fixture
+def source():
+    """A single retrieved knowledge source."""
+    return SearchResult(
+        document_id="doc_1",
+        title="AI Career Guide",
+        content_snippet="Start with Python and statistics...",
+        summary="How to move into AI engineering",
+        document_type=DocumentType.CAREER_GUIDE,
+        similarity_score=0.9,
+        tags=["career", "ai"],
+    )
+
+
+@pytest.fixture
+def rag_service(test_settings, completion, source):
+    """RAG service with mocked OpenAI and search clients."""
+    service = RAGEnhancedAIService(test_settings)
+    service.client = MagicMock()
+    service.client.chat.completions.create = AsyncMock(return_value=completion)
+    service.search_service = MagicMock()
+    service.search_service.generate_embeddings = AsyncMock(
+        side_effect=lambda texts: [[1.0, 0.0] for _ in texts]
+    )
+    service.search_service.semantic_search = AsyncMock(return_value=[source])
+    return service
+
+
+class TestShouldUseRag:
+    """Test keyword-based retrieval gating."""
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("How do I become an AI Engineer?", True),
+            ("Any MACHINE LEARNING bootcamps?", True),
+            ("Tips for my résumé and portfolio", True),
+            ("Hello, how are you?", False),
+            ("What's 2 + 2?", False),
+        ],
+    )
+    def test_matches_keywords_case_insensitively(self, rag_service, query, expected):
+        """Any keyword anywhere in the query enables retrieval."""
+        assert rag_service._should_use_rag(query) is expected
+
+
+class TestConfidenceScore:
+    """Test confidence derived from retrieval similarity."""
+
+    def test_mean_similarity_is_scaled(self, source):
+        """The mean similarity maps onto the 0.7-0.95 range."""
+        weaker = source.model_copy(update={"similarity_score": 0.5})
+
+        assert _confidence_score([source, weaker]) == pytest.approx(0.875)
+        assert _confidence_score([]) is None
+
+
+class TestEmbeddingBatching:
+    """Test coalescing of concurrent query embeddings."""
+
+    async def test_concurrent_requests_share_one_embedding_call(self, rag_service):
+        """Queries arriving together are embedded in a single request."""
+        embed = rag_service.search_service.generate_embeddings
+        embed.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+
+        vectors = await asyncio.gather(
+            rag_service._embed_query("a"),
+            rag_service._embed_query("bb"),
+            rag_service._embed_query("ccc"),
+        )
+
+        embed.assert_awaited_once_with(["a", "bb", "ccc"])
+        assert vectors == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+
+    async def test_full_batch_is_sent_without_waiting(self, rag_service):
+        """Reaching the batch size flushes immediately."""
+        rag_service._embedding_batcher.max_batch_size = 2
+        rag_service._embedding_batcher.window_seconds = 60
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                rag_service._embed_query("a"), rag_service._embed_query("b")
+            ),
+            1,
+        )
+
+        rag_service.search_service.generate_embeddings.assert_awaited_once()
+
+    async def test_batch_failure_reaches_every_caller(self, rag_service):
+        """A failed batch request fails each query's embedding."""
+        rag_service.search_service.generate_embeddings.side_effect = RuntimeError(
+            "down"
+        )
+
+        vectors = await asyncio.gather(
+            rag_service._embed_query("a"), rag_service._embed_query("b")
+        )
+
+        assert vectors == [None, None]
+
+    async def test_short_batch_response_fails_every_caller(self, rag_service):
+        """Missing embeddings fail the batch instead of leaving callers waiting."""
+        rag_service.search_service.generate_embeddings.side_effect = lambda texts: [
+            [1.0, 0.0]
+        ]
+
+        vectors = await asyncio.wait_for(
+            asyncio.gather(
+                rag_service._embed_query("a"), rag_service._embed_query("b")
+            ),
+            1,
+        )
+
+        assert vectors == [None, None]
+
+
+class TestPromptAssembly:
+    """Test message construction for knowledge-enhanced completions."""
+
+    def test_system_prompt_is_static(self, rag_service, source):
+        """Sources and history go in later messages, not the system prompt."""
+        history = [
+            ChatMessage(content="I'm a backend developer", role="user"),
+            ChatMessage(content="Great starting point!", role="assistant"),
+        ]
+        first = rag_service._build_rag_messages("How do I start?", [source], history)
+        second = rag_service._build_rag_messages("Which course?", [], [])
+
+        assert first[0] is second[0] is rag_service._static_system_msg
+        assert first[1]["role"] == "system"
+        assert first[1]["content"] == (
+            "[Source 1] AI Career Guide\n"
+            "Type: career_guide\n"
+            "Summary: How to move into AI engineering\n"
+            "Content: Start with Python and statistics...\n"
+            "Tags: career, ai\n"
+            "Relevance Score: 0.90"
+        )
+        assert [m["role"] for m in first[2:]] == ["user", "assistant", "user"]
+        assert first[-1]["content"] == "How do I start?"
+
+    async def test_standard_system_message_is_shared(self, rag_service):
+        """Non-RAG requests reuse the class-level system message."""
+        rag_service.search_service.semantic_search.return_value = []
+
+        await rag_service.generate_rag_response(
+            ChatRequest(message="Hello there", user_id="u1")
+        )
+
+        messages = rag_service.client.chat.completions.create.await_args.kwargs[
+            "messages"
+        ]
+        assert messages[0] is RAGEnhancedAIService._DEFAULT_SYSTEM_MSG
+        assert messages[-1] == {"role": "user", "content": "Hello there"}
+
+
+class TestSemanticCache:
+    """Test semantic cache use in generate_rag_response."""
+
+    async def test_similar_query_is_served_from_cache(self, rag_service):
+        """A paraphrased query skips both retrieval and generation."""
+        first = await rag_service.generate_rag_response(
+            ChatRequest(message="How do I start an AI career?", user_id="u1")
+        )
+        rag_service.search_service.generate_embeddings.side_effect = lambda texts: [
+            [0.99, 0.05] for _ in texts
+        ]
+        second = await rag_service.generate_rag_response(
+            ChatRequest(
+                message="How can I begin a career in AI?",
+                user_id="u2",
+                conversation_id="conv-2",
+            )
+        )
+
+        assert rag_service.client.chat.completions.create.await_count == 1
+        assert rag_service.search_service.semantic_search.await_count == 1
+        assert second.message == first.message
+        assert second.retrieved_sources == first.retrieved_sources
+        assert second.id != first.id
+        assert second.conversation_id == "conv-2"
+        assert second.token_usage is None
+        assert [m.role for m in rag_service.conversation_history["conv-2"]] == [
+            "user",
+            "assistant",
+        ]
+
+    async def test_query_embedding_is_reused_for_search(self, rag_service):
+        """Retrieval uses the embedding computed for the cache lookup."""
+        await rag_service.generate_rag_response(
+            ChatRequest(message="Which skills matter for AI jobs?", user_id="u1")
+        )
+
+        rag_service.search_service.generate_embeddings.assert_awaited_once()
+        call = rag_service.search_service.semantic_search.await_args
+        assert call.kwargs["query_vector"] == [1.0, 0.0]
+
+    async def test_embedding_failure_skips_cache(self, rag_service):
+        """If the query cannot be embedded, the request is still answered."""
+        rag_service.search_service.generate_embeddings.side_effect = RuntimeError(
+            "embedding service down"
+        )
+
+        response = await rag_service.generate_rag_response(
+            ChatRequest(message="Tips for an AI interview?", user_id="u1")
+        )
+
+        assert response.message == "Build a portfolio of ML projects."
+        assert rag_service.semantic_cache.size() == 0
+
+    @pytest.fixture
+    def conversation(self, rag_service):
+        rag_service.conversation_history["conv-1"] = [
+            ChatMessage(content="I'm a backend developer.", role="user"),
+            ChatMessage(content="Great, that background helps.", role="assistant"),
+        ]
+        return "conv-1"
+
+    async def test_follow_up_questions_skip_cache(self, rag_service, conversation):
+        """Requests with conversation history neither read nor write the cache."""
+        rag_service.semantic_cache.aget = AsyncMock()
+
+        await rag_service.generate_rag_response(
+            ChatRequest(
+                message="What salary can an AI engineer expect?",
+                user_id="u1",
+                conversation_id=conversation,
+            )
+        )
+
+        rag_service.semantic_cache.aget.assert_not_awaited()
+        assert rag_service.semantic_cache.size() == 0
+        # The embedding still serves retrieval
+        call = rag_service.search_service.semantic_search.await_args
+        assert call.kwargs["query_vector"] == [1.0, 0.0]
+
+    async def test_non_rag_queries_skip_embedding(self, rag_service):
+        """Without retrieval, no embedding is requested just for the cache."""
+        await rag_service.generate_rag_response(
+            ChatRequest(message="Thanks, that helps!", user_id="u1")
+        )
+
+        rag_service.search_service.generate_embeddings.assert_not_awaited()
+        rag_service.search_service.semantic_search.assert_not_awaited()
+        assert rag_service.semantic_cache.size() == 0
+
+    async def test_history_and_embedding_are_fetched_together(self, rag_service):
+        """RAG queries load history concurrently with the query embedding."""
+        embedding_started = asyncio.Event()
+
+        async def history(conversation_id):
+            # Only completes if the embedding request runs in the meantime
+            await embedding_started.wait()
+            return []
+
+        async def embed(texts):
+            embedding_started.set()
+            return [[1.0, 0.0] for _ in texts]
+
+        rag_service._get_conversation_history = history
+        rag_service.search_service.generate_embeddings.side_effect = embed
+
+        response = await asyncio.wait_for(
+            rag_service.generate_rag_response(
+                ChatRequest(message="Career advice please", user_id="u1")
+            ),
+            1,
+        )
+
+        assert response.knowledge_enhanced
+
+
+class TestStreamingRetrievalOverlap:
+    """Test the speculative completion opened during streaming retrieval."""
+
+    async def test_speculative_stream_used_without_sources(self, rag_service):
+        """With nothing retrieved, the stream opened during retrieval is used."""
+        rag_service.search_service.semantic_search.return_value = []
+        rag_service.client.chat.completions.create.return_value = FakeStream(
+            "Keep ", "learning!"
+        )
+
+        events = await collect(
+            rag_service.generate_streaming_rag_response(
+                ChatRequest(
+                    message="Career advice please",
+                    user_id="u1",
+                    conversation_id="c1",
+                )
+            )
+        )
+
+        assert rag_service.client.chat.completions.create.await_count == 1
+        assert [e["content"] for e in events if e["type"] == "content_chunk"] == [
+            "Keep ",
+            "learning!",
+        ]
+        assert events[-1]["knowledge_enhanced"] is False
+        # The streamed chunks are recorded as one assistant message
+        assert rag_service.conversation_history["c1"][-1].content == "Keep learning!"
+
+    async def test_speculative_stream_discarded_when_sources_found(
+        self, rag_service
+    ):
+        """Retrieved knowledge restarts generation with the RAG prompt."""
+        speculative, enhanced = FakeStream("plain"), FakeStream("with sources")
+        create = rag_service.client.chat.completions.create
+        create.side_effect = [speculative, enhanced]
+        sources = rag_service.search_service.semantic_search.return_value
+
+        async def slow_search(query, query_vector=None):
+            # The speculative request completes while retrieval is in flight
+            while not create.await_count:
+                await asyncio.sleep(0)
+            return sources
+
+        rag_service.search_service.semantic_search.side_effect = slow_search
+
+        events = await collect(
+            rag_service.generate_streaming_rag_response(
+                ChatRequest(message="Career advice please", user_id="u1")
+            )
+        )
+
+        speculative.response.aclose.assert_awaited_once()
+        enhanced.response.aclose.assert_not_awaited()
+        rag_messages = create.await_args.kwargs["messages"]
+        assert rag_messages[1]["content"].startswith("[Source 1]")
+        assert [e["content"] for e in events if e["type"] == "content_chunk"] == [
+            "with sources"
+        ]
+        assert events[-1]["knowledge_enhanced"] is True
+
+    async def test_speculative_stream_closed_on_disconnect(self, rag_service):
+        """A consumer leaving after retrieval does not leak the open stream."""
+        speculative = FakeStream("plain")
+        rag_service.client.chat.completions.create.return_value = speculative
+        events = rag_service.generate_streaming_rag_response(
+            ChatRequest(message="Career advice please", user_id="u1")
+        )
+
+        first = await events.__anext__()
+        # Let the speculative request complete before the client disconnects
+        create = rag_service.client.chat.completions.create
+        while not create.await_count:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await events.aclose()
+
+        assert first["type"] == "retrieval_complete"
+        speculative.response.aclose.assert_awaited_once()
+
+    async def test_discarding_does_not_swallow_caller_cancellation(self):
+        """Cancelling the task that discards a stream still cancels it."""
+        teardown_started = asyncio.Event()
+
+        async def slow_open():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                teardown_started.set()
+                await asyncio.sleep(10)  # slow teardown of the request
+                raise
+
+        stream_task = asyncio.create_task(slow_open())
+        await asyncio.sleep(0)
+        discarding = asyncio.create_task(_discard_stream(stream_task))
+        await teardown_started.wait()
+        discarding.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await discarding
+        assert stream_task.cancelled()
+
+
+class TestConversationHistory:
+    """Test bounded per-conversation history."""
+
+    async def test_history_keeps_most_recent_messages(self, rag_service):
+        """Old messages are evicted once the history limit is reached."""
+        rag_service.max_history_messages = 4
+        rag_service.semantic_cache.similarity_threshold = 1.1  # never hit
+
+        for i in range(3):
+            await rag_service.generate_rag_response(
+                ChatRequest(message=f"question {i}", user_id="u1", conversation_id="c1")
+            )
+
+        history = rag_service.conversation_history["c1"]
+        assert len(history) == 4
+        assert [m.content for m in history if m.role == "user"] == [
+            "question 1",
+            "question 2",
+        ]
+
+
+class TestSemanticResponseCache:
+    """Test the embedding-keyed response cache."""
+
+    def test_lookup_requires_threshold_similarity(self):
+        """Only embeddings at or above the cosine threshold are hits."""
+        cache = SemanticResponseCache(similarity_threshold=0.9)
+        cache.set([1.0, 0.0], "answer")
+
+        assert cache.get([2.0, 0.1]) == "answer"
+        assert cache.get([0.5, 0.5]) is None
+
+    def test_most_similar_entry_wins(self):
+        """Among entries above the threshold, the closest one is returned."""
+        cache = SemanticResponseCache(similarity_threshold=0.9)
+        cache.set([1.0, 0.3], "near")
+        cache.set([1.0, 0.1], "nearest")
+
+        assert cache.get([1.0, 0.0]) == "nearest"
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """A full cache drops the entry that was hit least recently."""
+        cache = SemanticResponseCache(max_size=2)
+        cache.set([1.0, 0.0, 0.0], "x")
+        cache.set([0.0, 1.0, 0.0], "y")
+        cache.get([1.0, 0.0, 0.0])
+        cache.set([0.0, 0.0, 1.0], "z")
+
+        assert cache.size() == 2
+        assert cache.get([0.0, 1.0, 0.0]) is None
+        assert cache.get([1.0, 0.0, 0.0]) == "x"
+
+    def test_expired_entries_are_dropped(self, monkeypatch):
+        """Entries older than the TTL are removed on lookup."""
+        cache = SemanticResponseCache(ttl_seconds=10)
+        now = [1000.0]
+        monkeypatch.setattr("src.services.cache_service.time.time", lambda: now[0])
+        cache.set([1.0, 0.0], "answer")
+
+        now[0] += 11
+
+        assert cache.get([1.0, 0.0]) is None
+        assert cache.size() == 0
+
+    def test_same_embedding_replaces_entry(self):
+        """Re-caching an embedding (at any scale) overwrites the old entry."""
+        cache = SemanticResponseCache()
+        cache.set([3.0, 4.0], "old")
+        cache.set([0.6, 0.8], "new")
+
+        assert cache.size() == 1
+        assert cache.get([3.0, 4.0]) == "new"
+
+    async def test_async_lookup_matches_sync_lookup(self):
+        """aget finds exact and near matches, and misses below the threshold."""
+        cache = SemanticResponseCache(similarity_threshold=0.9)
+        cache.set([1.0, 0.0], "answer")
+
+        assert await cache.aget([1.0, 0.0]) == "answer"
+        assert await cache.aget([2.0, 0.1]) == "answer"
+        assert await cache.aget([0.5, 0.5]) is None
+
+    def test_lookup_is_limited_to_scope(self):
+        """Entries only match lookups made with the same scope."""
+        cache = SemanticResponseCache()
+        cache.set([1.0, 0.0], "all documents")
+        cache.set([1.0, 0.0], "guides only", scope=("career_guide",))
+
+        assert cache.get([1.0, 0.0]) == "all documents"
+        assert cache.get([1.0, 0.0], scope=("career_guide",)) == "guides only"
+        assert cache.get([1.0, 0.0], scope=("course",)) is None
+
+
+class TestExpiringLRUDict:
+    """Test the bounded, idle-expiring conversation store."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(
+            "src.services.cache_service.time.monotonic", lambda: now[0]
+        )
+        return now
+
+    def test_idle_entries_expire_but_active_ones_stay(self, clock):
+        """Reading an entry keeps it alive past its original TTL."""
+        store = ExpiringLRUDict(max_size=10, ttl_seconds=60)
+        store["active"] = ["hi"]
+        store["idle"] = ["hello"]
+
+        clock[0] += 40
+        store["active"].append("again")
+        clock[0] += 40
+
+        assert "idle" not in store
+        assert store.get("active") == ["hi", "again"]
+        assert len(store) == 1
+
+    def test_least_recently_used_entry_is_evicted(self, clock):
+        """Beyond max_size, the entry accessed longest ago is dropped."""
+        store = ExpiringLRUDict(max_size=2, ttl_seconds=60)
+        store["a"], store["b"] = 1, 2
+        store["a"]
+        store["c"] = 3
+
+        assert list(store) == ["a", "c"]
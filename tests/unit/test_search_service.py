@@ -0,0 +1,477 @@
+"""
+Unit tests for the AzureCognitiveSearchService.
+
+The Azure Search and OpenAI clients are replaced with mocks, so these tests
+cover request construction and result handling without Azure access.
+"""
+
+import asyncio
+import math
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.models.rag_models import DocumentType, KnowledgeDocument, SearchQuery
+from src.services.search_service import (
+    AzureCognitiveSearchService,
+    _snippet,
+    _TokenBucket,
+)
+
+
+def embedding_response(*vectors):
+    """Build an embeddings API response, with items in reverse index order."""
+    response = MagicMock()
+    response.data = [
+        MagicMock(index=index, embedding=list(vector))
+        for index, vector in reversed(list(enumerate(vectors)))
+    ]
+    return response
+
+
+def knowledge_document(doc_id):
+    """Build a minimal knowledge document."""
+    return KnowledgeDocument(
+        id=doc_id,
+        title=f"Guide {doc_id}",
+        content="Learn Python, statistics and machine learning.",
+        summary="Getting started in AI",
+        document_type=DocumentType.CAREER_GUIDE,
+    )
+
+
+def upload_results(documents):
+    """Successful upload results for the given index documents."""
+    return [MagicMock(succeeded=True, key=doc["id"]) for doc in documents]
+
+
+def search_hit(doc_id, score=None, reranker_score=None):
+    """Search result as returned by the SDK: a dict with "@search.*" keys."""
+    return {
+        "id": doc_id,
+        "title": f"Guide {doc_id}",
+        "content": "Learn Python first.",
+        "summary": "Getting started",
+        "document_type": DocumentType.CAREER_GUIDE.value,
+        "tags": ["ai"],
+        "@search.score": score,
+        "@search.reranker_score": reranker_score,
+        "@search.captions": None,
+    }
+
+
+async def search_results(*hits):
+    for hit in hits:
+        yield hit
+
+
+@pytest.fixture
+def search_service(test_settings):
+    """Search service with mocked Azure Search and OpenAI clients."""
+    service = AzureCognitiveSearchService(test_settings)
+    service.search_client = MagicMock()
+    service.openai_client = MagicMock()
+    service.openai_client.embeddings.create = AsyncMock()
+    return service
+
+
+class TestInitializeIndex:
+    """Test search index creation."""
+
+    async def test_hnsw_parameters_come_from_settings(self, search_service):
+        """The vector index is built with the configured HNSW parameters."""
+        search_service.index_client = MagicMock()
+        search_service.index_client.create_or_update_index = AsyncMock()
+
+        assert await search_service.initialize_index()
+
+        index = search_service.index_client.create_or_update_index.await_args.args[0]
+        assert index.vector_search.algorithms[0].parameters == {
+            "m": 10,
+            "efConstruction": 200,
+            "efSearch": 100,
+            "metric": "dotProduct",
+        }
+
+
+class TestEmbeddings:
+    """Test embedding generation."""
+
+    def test_embedding_client_retries_transient_errors(self, test_settings):
+        """Rate-limited embedding calls are retried with the service's budget."""
+        service = AzureCognitiveSearchService(test_settings)
+
+        assert service.openai_client.max_retries == service.max_retries == 3
+
+    async def test_embedding_is_unit_length(self, search_service):
+        """Vectors are normalized to match the dot product index metric."""
+        search_service.openai_client.embeddings.create.return_value = (
+            embedding_response([3.0, 4.0])
+        )
+
+        vector = await search_service.generate_embedding("AI careers")
+
+        assert vector == [0.6, 0.8]
+
+    async def test_batch_embeddings_keep_input_order(self, search_service):
+        """Batched embeddings are returned in input order, normalized."""
+        search_service.openai_client.embeddings.create.return_value = (
+            embedding_response([2.0, 0.0], [0.0, 5.0])
+        )
+
+        vectors = await search_service.generate_embeddings(["first", "second"])
+
+        search_service.openai_client.embeddings.create.assert_awaited_once_with(
+            input=["first", "second"], model="text-embedding-ada-002"
+        )
+        assert vectors == [[1.0, 0.0], [0.0, 1.0]]
+        assert all(math.isclose(math.hypot(*v), 1.0) for v in vectors)
+
+
+class TestBatchIndexing:
+    """Test batch indexing of knowledge documents."""
+
+    async def test_each_batch_is_embedded_in_one_request(self, search_service):
+        """Documents are embedded one request per upload batch, in order."""
+        embed = search_service.openai_client.embeddings.create
+        embed.side_effect = lambda input, model: embedding_response(
+            *([1.0, 0.0] for _ in input)
+        )
+        upload = search_service.search_client.upload_documents = AsyncMock(
+            side_effect=upload_results
+        )
+
+        status = await search_service.index_documents_batch(
+            [knowledge_document(f"doc_{i}") for i in range(20)]
+        )
+
+        assert [len(call.kwargs["input"]) for call in embed.await_args_list] == [
+            16,
+            4,
+        ]
+        assert embed.await_args_list[0].kwargs["input"][0].startswith("Guide doc_0 ")
+        assert [doc["id"] for doc in upload.await_args.args[0]] == [
+            f"doc_{i}" for i in range(16, 20)
+        ]
+        assert upload.await_args.args[0][0]["content_length"] == len(
+            knowledge_document("doc_16").content
+        )
+        assert status.documents_successful == 20
+
+    async def test_next_batch_is_embedded_during_upload(self, search_service):
+        """Uploading one batch overlaps with embedding the next."""
+        second_batch_embedding = asyncio.Event()
+        embed = search_service.openai_client.embeddings.create
+
+        async def create(input, model):
+            if embed.await_count == 2:
+                second_batch_embedding.set()
+            return embedding_response(*([1.0, 0.0] for _ in input))
+
+        async def upload(documents):
+            # Only completes if the next batch is embedded in the meantime
+            if documents[0]["id"] == "doc_0":
+                await second_batch_embedding.wait()
+            return upload_results(documents)
+
+        embed.side_effect = create
+        search_service.search_client.upload_documents = AsyncMock(side_effect=upload)
+
+        status = await asyncio.wait_for(
+            search_service.index_documents_batch(
+                [knowledge_document(f"doc_{i}") for i in range(20)]
+            ),
+            1,
+        )
+
+        assert status.status == "completed"
+        assert status.documents_processed == 20
+        assert status.documents_successful == 20
+
+    async def test_failed_embedding_request_fails_its_batch(self, search_service):
+        """A failed embeddings request is reported for its whole batch."""
+        search_service.openai_client.embeddings.create.side_effect = RuntimeError(
+            "rate limited"
+        )
+        upload = search_service.search_client.upload_documents = AsyncMock()
+
+        status = await search_service.index_documents_batch(
+            [knowledge_document(f"doc_{i}") for i in range(3)]
+        )
+
+        upload.assert_not_awaited()
+        assert status.documents_processed == 3
+        assert status.documents_failed == 3
+        assert status.error_messages == ["Batch embedding error: rate limited"]
+
+    async def test_short_embedding_response_fails_its_batch(self, search_service):
+        """Documents missing from an embeddings response are counted as failed."""
+        search_service.openai_client.embeddings.create.side_effect = (
+            lambda input, model: embedding_response([1.0, 0.0])
+        )
+        upload = search_service.search_client.upload_documents = AsyncMock()
+
+        status = await search_service.index_documents_batch(
+            [knowledge_document(f"doc_{i}") for i in range(3)]
+        )
+
+        upload.assert_not_awaited()
+        assert status.documents_processed == 3
+        assert status.documents_failed == 3
+        assert status.error_messages == [
+            "Batch embedding error: expected 3 embeddings, got 1"
+        ]
+
+    async def test_cancelling_stops_embedding(self, search_service):
+        """Cancelling mid-upload also ends the embedding task blocked on the queue."""
+        upload_started = asyncio.Event()
+
+        async def upload(documents):
+            upload_started.set()
+            await asyncio.Event().wait()  # never completes
+
+        search_service.openai_client.embeddings.create.side_effect = (
+            lambda input, model: embedding_response(*([1.0, 0.0] for _ in input))
+        )
+        search_service.search_client.upload_documents = AsyncMock(side_effect=upload)
+        tasks_before = asyncio.all_tasks()
+
+        indexing = asyncio.create_task(
+            search_service.index_documents_batch(
+                [knowledge_document(f"doc_{i}") for i in range(80)]
+            )
+        )
+        await upload_started.wait()
+        # Let embedding fill the upload queue and block on it
+        for _ in range(10):
+            await asyncio.sleep(0)
+        indexing.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await indexing
+        assert not asyncio.all_tasks() - tasks_before
+
+
+class TestSemanticSearch:
+    """Test result scoring and ordering."""
+
+    @pytest.mark.parametrize(
+        "content, expected",
+        [("short", "short"), ("x" * 500, "x" * 500), ("x" * 501, "x" * 500 + "...")],
+    )
+    def test_snippet_truncates_long_content(self, content, expected):
+        """Only content longer than the limit is cut and marked."""
+        assert _snippet(content) == expected
+
+    async def test_results_are_scored_filtered_and_ordered(self, search_service):
+        """Scores come from the result keys; low scorers are dropped."""
+        search_service.search_client.search = AsyncMock(
+            return_value=search_results(
+                search_hit("vector", score=0.75),
+                search_hit("weak", score=0.02, reranker_score=1.0),
+                search_hit("reranked", score=0.03, reranker_score=3.6),
+                search_hit("capped", score=1.4),
+            )
+        )
+
+        results = await search_service.semantic_search(
+            SearchQuery(query="AI careers"), query_vector=[1.0, 0.0]
+        )
+
+        assert [(r.document_id, r.similarity_score) for r in results] == [
+            ("capped", 1.0),
+            ("reranked", 0.9),
+            ("vector", 0.75),
+        ]
+
+    async def test_metadata_is_parsed(self, search_service):
+        """Stored metadata JSON is decoded; invalid metadata is ignored."""
+        hit = search_hit("doc_1", score=0.9)
+        hit["metadata"] = '{"level": "beginner", "hours": 12}'
+        broken = search_hit("doc_2", score=0.8)
+        broken["metadata"] = "{not json"
+        search_service.search_client.search = AsyncMock(
+            return_value=search_results(hit, broken)
+        )
+
+        results = await search_service.semantic_search(
+            SearchQuery(query="AI careers"), query_vector=[1.0, 0.0]
+        )
+
+        assert results[0].metadata == {"level": "beginner", "hours": 12}
+        assert results[1].metadata == {}
+
+    async def test_stored_vectors_are_not_fetched(self, search_service):
+        """Searches select the result fields, leaving out content_vector."""
+        search_service.search_client.search = AsyncMock(
+            return_value=search_results()
+        )
+
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers"), query_vector=[1.0, 0.0]
+        )
+
+        select = search_service.search_client.search.await_args.kwargs["select"]
+        assert "content_vector" not in select
+        assert {"id", "content", "metadata"} <= set(select)
+
+
+class TestSearchCache:
+    """Test reuse of results for near-duplicate queries."""
+
+    @pytest.fixture
+    def search(self, search_service):
+        search_service.search_client.search = AsyncMock(
+            side_effect=lambda **params: search_results(search_hit("doc_1", 0.9))
+        )
+        return search_service.search_client.search
+
+    async def test_similar_query_reuses_results(self, search_service, search):
+        """A query embedding close to a cached one skips the search request."""
+        first = await search_service.semantic_search(
+            SearchQuery(query="AI careers"), query_vector=[1.0, 0.0]
+        )
+        second = await search_service.semantic_search(
+            SearchQuery(query="careers in AI"), query_vector=[0.99, 0.01]
+        )
+
+        assert search.await_count == 1
+        assert [r.document_id for r in second] == ["doc_1"]
+        assert second == first and second is not first
+
+    async def test_different_filters_are_searched(self, search_service, search):
+        """Cached results are only reused for the same filters and limits."""
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers"), query_vector=[1.0, 0.0]
+        )
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers", tags=["python"]), query_vector=[1.0, 0.0]
+        )
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers", max_results=3), query_vector=[1.0, 0.0]
+        )
+
+        assert search.await_count == 3
+
+    async def test_exhaustive_queries_bypass_hnsw(self, search_service, search):
+        """Exhaustive queries ask Azure for an exact vector search."""
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers", exhaustive=True), query_vector=[1.0, 0.0]
+        )
+
+        vector_query = search.await_args.kwargs["vector_queries"][0]
+        assert vector_query.exhaustive is True
+
+    async def test_filter_order_does_not_matter(self, search_service, search):
+        """The same filters in a different order share cached results."""
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers", tags=["python", "ml"]),
+            query_vector=[1.0, 0.0],
+        )
+        await search_service.semantic_search(
+            SearchQuery(query="AI careers", tags=["ml", "python"]),
+            query_vector=[1.0, 0.0],
+        )
+
+        assert search.await_count == 1
+
+    async def test_query_is_normalized_before_embedding(self, search_service, search):
+        """Case, spacing and trailing punctuation do not change the embedding."""
+        embed = search_service.generate_embedding = AsyncMock(
+            return_value=[1.0, 0.0]
+        )
+
+        await search_service.semantic_search(SearchQuery(query="  AI   Careers?! "))
+        await search_service.semantic_search(SearchQuery(query="ai careers"))
+
+        assert [call.args[0] for call in embed.await_args_list] == [
+            "ai careers",
+            "ai careers",
+        ]
+        assert search.await_count == 1
+
+    async def test_deleting_a_document_clears_cache(self, search_service, search):
+        """Index changes invalidate cached results."""
+        search_service.search_client.delete_documents = AsyncMock(
+            return_value=[MagicMock(succeeded=True)]
+        )
+        query = SearchQuery(query="AI careers")
+
+        await search_service.semantic_search(query, query_vector=[1.0, 0.0])
+        await search_service.delete_document("doc_1")
+        await search_service.semantic_search(query, query_vector=[1.0, 0.0])
+
+        assert search.await_count == 2
+
+
+class TestKnowledgeBaseStats:
+    """Test knowledge base statistics aggregation."""
+
+    async def test_stats_queries_run_concurrently(self, search_service):
+        """The count, facet and sample queries are issued together."""
+        all_issued = asyncio.Event()
+        issued = []
+
+        async def search(**params):
+            issued.append(params)
+            if len(issued) == 3:
+                all_issued.set()
+            # Only completes once every query has been sent
+            await all_issued.wait()
+            results = MagicMock()
+            results.get_count = AsyncMock(return_value=2)
+            results.get_facets = AsyncMock(
+                return_value={"document_type": [{"value": "career_guide", "count": 2}]}
+            )
+            results.__aiter__ = lambda self: search_results(
+                {"content_length": 4}, {"content_length": 2}, {}
+            )
+            return results
+
+        search_service.search_client.search = search
+
+        stats = await asyncio.wait_for(search_service.get_knowledge_base_stats(), 1)
+
+        assert len(issued) == 3
+        assert issued[2]["select"] == ["content_length"]
+        assert stats.total_documents == 2
+        assert stats.documents_by_type == {DocumentType.CAREER_GUIDE: 2}
+        assert stats.average_document_length == 3
+
+
+class TestTokenBucket:
+    """Test the upload rate limiter."""
+
+    async def test_burst_then_paced(self):
+        """Requests within capacity start at once; later ones wait for tokens."""
+        limiter = _TokenBucket(rate=50, capacity=2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        await limiter.acquire()
+        await limiter.acquire()
+        burst = loop.time() - start
+        await limiter.acquire()
+        await limiter.acquire()
+        paced = loop.time() - start
+
+        assert burst < 0.01
+        assert paced >= 0.035
+
+    async def test_batches_within_budget_do_not_wait(self, search_service):
+        """Indexing is no longer slowed by a fixed delay between batches."""
+        search_service.openai_client.embeddings.create.side_effect = (
+            lambda input, model: embedding_response(*([1.0, 0.0] for _ in input))
+        )
+        search_service.search_client.upload_documents = AsyncMock(
+            side_effect=upload_results
+        )
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        status = await search_service.index_documents_batch(
+            [knowledge_document(f"doc_{i}") for i in range(48)]
+        )
+
+        assert status.documents_successful == 48
+        # The old fixed delay alone added 0.1s per batch
+        assert loop.time() - start < 0.25
@@ -138,6 +138,20 @@ class TestSettings:
                 with pytest.raises(ValidationError):
                     Settings()
 
+    def test_hnsw_parameter_validation(self):
+        """Test HNSW parameters are limited to the ranges Azure accepts."""
+        settings = Settings(hnsw_m=4, hnsw_ef_construction=1000, hnsw_ef_search=100)
+        assert settings.hnsw_m == 4
+
+        for invalid in [
+            {"hnsw_m": 16},
+            {"hnsw_m": 3},
+            {"hnsw_ef_construction": 64},
+            {"hnsw_ef_search": 1001},
+        ]:
+            with pytest.raises(ValidationError):
+                Settings(**invalid)
+
     def test_max_tokens_validation(self):
         """Test max_tokens parameter validation."""
         base_env = {